@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Headless balancing sweeps over many sessions, on every core.
+
+Plays seeded sessions of a bot policy over every combination of --sweep
+values, in a process pool, and writes one JSON line of stats per session.
+
+    python batch.py --runs 1000 --policy hunter --sweep shot_delay=[150,250,400] \\
+        --sweep crash_damage=[10,25] --out sweep.jsonl
+    python batch.py --report sweep.jsonl
+"""
+import headless  # must come first: switches SDL to the dummy drivers
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from engine.timestep import SIM_HZ
+from engine.waves import WaveSchedule, default_schedule, load as load_waves
+from engine.world import SWARM_BATCH, VARIANTS, make_world, variant_rules
+
+# Overrides that go to the world instead of its rules
+WORLD_OPTIONS = ("waves", "spawn_every", "batch")
+
+_screen = None  # the worker's dummy display, kept between sessions
+_worlds = {}  # config -> (world, its state at step 0), kept between sessions
+
+
+def world_options(variant, overrides):
+    """(rules overrides, world options) for one config
+
+    Overrides are any Rules setting plus waves (a schedule file or inline
+    schedule), spawn_every (the classic pacing with one spawn every N
+    steps) and batch (enemies per spawn, swarm only). Raises ValueError
+    for anything the variant can't take.
+    """
+    rules = {name: value for name, value in overrides.items() if name not in WORLD_OPTIONS}
+    variant_rules(variant, rules)  # unknown rules raise here, before any session runs
+    options = {}
+    if "batch" in overrides:
+        if variant != "swarm":
+            raise ValueError("batch only applies to the swarm variant")
+        options["batch"] = overrides["batch"]
+    waves = overrides.get("waves")
+    every = overrides.get("spawn_every")
+    if waves is not None and every is not None:
+        raise ValueError("set waves or spawn_every, not both")
+    if isinstance(waves, dict):
+        try:
+            options["waves"] = WaveSchedule.from_dict(waves)
+        except TypeError as error:
+            raise ValueError(f"waves: {error}") from None
+    elif waves is not None:
+        options["waves"] = load_waves(waves)
+    elif every is not None:
+        count = options.get("batch", SWARM_BATCH) if variant == "swarm" else 1
+        options["waves"] = default_schedule(count, every)
+    return rules, options
+
+
+def config_world(config, overrides, variant):
+    """(world, starting snapshot) for config, built on first use"""
+    global _screen
+    if config not in _worlds:
+        rules, options = world_options(variant, overrides)
+        size = variant_rules(variant, rules).size
+        if _screen is None or _screen.get_size() != size:
+            _screen = headless.init(size)
+        world = make_world(variant, 0, rules or None, **options)
+        _worlds[config] = world, world.snapshot()
+    return _worlds[config]
+
+
+def fork_point(config, overrides, variant, seed, policy, steps):
+    """Snapshot of config's world after steps steps of seed's game"""
+    world, start = config_world(config, overrides, variant)
+    world.restore(start)
+    world.reseed(seed)
+    act = headless.load_policy(policy)(random.Random(seed))
+    for _ in range(steps):
+        world.step(act(world))
+        if world.game_over:
+            raise ValueError(f"config {config}: the player died before step {steps}")
+    return world.snapshot()
+
+
+def run_session(task):
+    """Play one session; returns its stats record"""
+    config, overrides, variant, seed, policy, steps, draw, fork = task
+    world, start = config_world(config, overrides, variant)
+    world.restore(fork or start)
+    world.reseed(seed)
+    act = headless.load_policy(policy)(random.Random(seed))
+    screen = _screen if draw else None
+
+    clock = time.perf_counter
+    costs = []
+    peak = 0
+    for _ in range(steps):
+        inputs = act(world)
+        start = clock()
+        world.step(inputs)
+        if screen is not None:
+            world.draw(screen)
+        costs.append(clock() - start)
+        count = world.entity_count()
+        if count > peak:
+            peak = count
+        if world.game_over:
+            break
+
+    costs.sort()
+    return {
+        "config": config,
+        "overrides": overrides,
+        "variant": variant,
+        "policy": policy,
+        "seed": seed,
+        "fork_at": fork["frame"] if fork else 0,
+        "steps": len(costs),
+        "survived_s": len(costs) / SIM_HZ,
+        "died": world.game_over,
+        "score": world.score,
+        "health": world.player.health,
+        "peak_entities": peak,
+        "step_ms": {
+            "mean": sum(costs) / len(costs) * 1000,
+            "p99": costs[min(len(costs) - 1, int(0.99 * len(costs)))] * 1000,
+            "max": costs[-1] * 1000,
+        },
+    }
+
+
+def _median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def report(records, out=sys.stderr):
+    """Print one line per config: deaths, survival, score, entities, step cost"""
+    configs = {}
+    for record in records:
+        configs.setdefault(record["config"], []).append(record)
+    for config, runs in sorted(configs.items()):
+        survived = [run["survived_s"] for run in runs]
+        scores = [run["score"] for run in runs]
+        died = sum(run["died"] for run in runs)
+        print(f"config {config} {json.dumps(runs[0]['overrides'])}  {len(runs)} runs  "
+              f"died {died / len(runs) * 100:5.1f}%  "
+              f"survived mean {sum(survived) / len(survived):7.1f}s p50 {_median(survived):7.1f}s  "
+              f"score mean {sum(scores) / len(scores):8.0f} p50 {_median(scores):6d}  "
+              f"peak entities {max(run['peak_entities'] for run in runs):5d}  "
+              f"step mean {sum(run['step_ms']['mean'] for run in runs) / len(runs):.3f} ms "
+              f"worst p99 {max(run['step_ms']['p99'] for run in runs):.3f} ms", file=out)
+
+
+def _override(text):
+    name, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected NAME=JSON, not {text!r}")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value  # a bare string, e.g. a waves file
+
+
+def configs(fixed, swept):
+    """Every combination of swept values, each on top of the fixed overrides"""
+    names = [name for name, _ in swept]
+    for values in itertools.product(*(values for _, values in swept)):
+        yield dict(fixed, **dict(zip(names, values)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many headless sessions in parallel")
+    parser.add_argument("--variant", default="game", choices=sorted(VARIANTS),
+                        help="which game's rules and world to start from")
+    parser.add_argument("--runs", type=int, default=100, help="sessions per config")
+    parser.add_argument("--seed", type=int, default=0, help="seed of each config's first run")
+    parser.add_argument("--steps", type=int, default=5 * 60 * SIM_HZ,
+                        help="most steps a session lasts (default 5 minutes of play)")
+    parser.add_argument("--policy", default="hunter",
+                        help=f"bot: {', '.join(headless.POLICIES)} or module:function")
+    parser.add_argument("--set", type=_override, action="append", default=[], metavar="NAME=JSON",
+                        help="override for every session (repeatable)")
+    parser.add_argument("--sweep", type=_override, action="append", default=[],
+                        metavar="NAME=JSON", help="JSON list of values to try (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes (default one per core, 1 runs in this process)")
+    parser.add_argument("--fork-at", type=int, default=0, metavar="N",
+                        help="start every run from step N of seed --seed's game")
+    parser.add_argument("--draw", action="store_true", help="render every step as well")
+    parser.add_argument("--out", default="batch.jsonl", help="results, one JSON line per session")
+    parser.add_argument("--report", metavar="FILE", help="summarise a results file instead")
+    args = parser.parse_args()
+
+    if args.report:
+        with open(args.report) as f:
+            report([json.loads(line) for line in f if line.strip()], sys.stdout)
+        return
+
+    for name, values in args.sweep:
+        if not isinstance(values, list) or not values:
+            parser.error(f"--sweep {name}: expected a JSON list of values")
+    sweep = list(configs(dict(args.set), args.sweep))
+    try:
+        for overrides in sweep:
+            world_options(args.variant, overrides)
+        headless.load_policy(args.policy)
+        forks = [fork_point(config, overrides, args.variant, args.seed, args.policy, args.fork_at)
+                 if args.fork_at else None for config, overrides in enumerate(sweep)]
+    except (ImportError, AttributeError, OSError, ValueError) as error:
+        parser.error(str(error))
+
+    # Run by run across the configs, so a sweep stopped early still covers them all
+    tasks = [(config, overrides, args.variant, args.seed + run, args.policy, args.steps, args.draw,
+              forks[config]) for run in range(args.runs) for config, overrides in enumerate(sweep)]
+    print(f"{len(tasks)} sessions: {len(sweep)} configs x {args.runs} runs "
+          f"on {args.workers} workers", file=sys.stderr)
+
+    start = time.perf_counter()
+    records = []
+    with open(args.out, "w") as out:
+        if args.workers > 1:
+            pool = multiprocessing.Pool(args.workers)
+            results = pool.imap_unordered(run_session, tasks,
+                                          chunksize=max(1, len(tasks) // (args.workers * 16)))
+        else:
+            pool = None
+            results = map(run_session, tasks)
+        try:
+            for record in results:
+                out.write(json.dumps(record) + "\n")
+                records.append(record)
+                if len(records) % 100 == 0:
+                    print(f"{len(records)}/{len(tasks)} sessions, "
+                          f"{time.perf_counter() - start:.0f}s", file=sys.stderr)
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+    elapsed = time.perf_counter() - start
+    steps = sum(record["steps"] for record in records)
+    print(f"{len(records)} sessions, {steps} steps in {elapsed:.1f}s "
+          f"({steps / elapsed:.0f} steps/s) -> {args.out}", file=sys.stderr)
+    report(records)
+
+
+if __name__ == "__main__":
+    main()
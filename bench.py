@@ -0,0 +1,325 @@
+# -*- coding: utf-8 -*-
+"""
+Reproducible frame-cost benchmarks.
+
+Drives the game worlds headless through fixed scenarios, times each phase
+of every frame and writes the results as JSON for comparing commits:
+
+    python bench.py --out before.json
+    python bench.py --compare before.json after.json
+"""
+import headless  # must come first: switches SDL to the dummy drivers
+
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from functools import partial
+from queue import Queue
+
+import pygame
+from engine.inputs import Inputs, NO_INPUT
+from engine.starfield import PARALLAX_LAYERS
+from engine.dirty import DirtyRenderer
+
+PHASES = ("update", "collision", "background", "draw", "hud", "present")
+
+# Games whose time to first frame --startup measures
+STARTUP_SCRIPTS = {"game": "game.py", "reddit": "game_reddit_background.py"}
+
+# World method -> phase it is billed to
+PHASE_METHODS = {
+    "update": "update",
+    "collide": "collision",
+    "update_background": "background",
+    "draw_background": "draw",
+    "draw_sprites": "draw",
+    "draw_hud": "hud",
+    "draw_game_over": "hud",
+}
+
+
+class Scenario:
+    """One benchmark setup: which game, what the player does, how crowded"""
+    def __init__(self, variant, inputs, enemies=0, stars=None, waves=None, description=""):
+        self.variant = variant  # "game", "swarm" (NumPy entity stores) or "reddit"
+        self.inputs = inputs  # function returning a per-frame input stream
+        self.enemies = enemies  # keep at least this many enemies alive
+        self.stars = stars  # starfield layers replacing the default ones
+        self.waves = waves  # wave schedule file replacing the classic spawning
+        self.description = description
+
+
+def _idle():
+    return headless.scripted([(1, NO_INPUT)])
+
+def _fire():
+    return headless.scripted([(1, Inputs(fire=True))])
+
+def _weave():
+    return headless.scripted([(90, Inputs(left=True, fire=True)), (90, Inputs(right=True, fire=True))])
+
+
+SCENARIOS = {
+    "idle": Scenario("game", _idle, description="no input, normal spawning"),
+    "fire": Scenario("game", _fire, description="holding fire, normal spawning"),
+    "enemies_50": Scenario("game", _weave, 50, description="50 enemies on screen"),
+    "enemies_200": Scenario("game", _weave, 200, description="200 enemies on screen"),
+    "enemies_1000": Scenario("game", _weave, 1000, description="1000 enemies on screen"),
+    "swarm_1000": Scenario("swarm", _weave, 1000, description="1000 enemies in NumPy entity stores"),
+    "swarm_5000": Scenario("swarm", _weave, 5000, description="5000 enemies in NumPy entity stores"),
+    "waves_ramp": Scenario("game", _weave, waves="waves/ramp.json",
+                           description="waves/ramp.json: formations ramping to dense waves"),
+    "stars_10k": Scenario("game", _weave, stars=PARALLAX_LAYERS,
+                          description="10k stars in three parallax layers"),
+    "reddit_scroll": Scenario("reddit", _weave, description="1080p scrolling local images"),
+}
+
+
+def _make_world(variant, images, seed, waves=None, stars=None):
+    """Build a world for variant on a dummy display of the right size"""
+    from engine.backgrounds import ScrollingImages, StarfieldBackground, letterbox
+    from engine.world import make_world, variant_rules
+    screen = headless.init(variant_rules(variant).size)
+    if variant != "reddit":
+        background = partial(StarfieldBackground, layers=stars) if stars else None
+        return make_world(variant, seed, waves=waves, background=background), screen, None
+
+    size = screen.get_size()
+    backgrounds = [letterbox(pygame.image.load(path).convert_alpha(), size) for path in images]
+    bg_queue = Queue()
+    world = make_world(variant, seed, waves=waves,
+                       background=lambda width, height, seed: ScrollingImages(width, height,
+                                                                              bg_queue, seed))
+
+    def refill():
+        # Always have a next image waiting so transitions keep happening
+        if bg_queue.empty():
+            for bg in backgrounds:
+                bg_queue.put(bg)
+    refill()
+    return world, screen, refill
+
+
+def _instrument(world, totals):
+    """Wrap the world's phase methods so their time lands in totals"""
+    clock = time.perf_counter
+    for method, phase in PHASE_METHODS.items():
+        original = getattr(world, method, None)
+        if original is None:
+            continue
+        def timed(*args, _original=original, _phase=phase):
+            start = clock()
+            result = _original(*args)
+            totals[_phase] += clock() - start
+            return result
+        # Instance attributes shadow the methods, so step()/draw() call these
+        setattr(world, method, timed)
+
+
+def _summary(samples):
+    """mean/p50/p99/max of a list of seconds, reported in milliseconds"""
+    ordered = sorted(samples)
+    count = len(ordered)
+    def pct(p):
+        return ordered[min(count - 1, int(p / 100 * count))] * 1000
+    return {
+        "mean_ms": sum(ordered) / count * 1000,
+        "p50_ms": pct(50),
+        "p99_ms": pct(99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def run_scenario(name, frames, warmup, seed, images, dirty=False):
+    """Run one scenario and return its timing summary"""
+    scenario = SCENARIOS[name]
+    random.seed(seed)
+    rng = random.Random(seed)  # separate stream for the enemy top-up
+    world, screen, refill = _make_world(scenario.variant, images, seed, scenario.waves,
+                                        scenario.stars)
+    width, height = screen.get_size()
+
+    totals = dict.fromkeys(PHASES, 0.0)
+    _instrument(world, totals)
+    renderer = DirtyRenderer(screen, enabled=dirty)
+    per_phase = {phase: [] for phase in PHASES}
+    per_frame = []
+    pixels = 0
+    inputs = scenario.inputs()
+    clock = time.perf_counter
+
+    # Invulnerable player, so crowded scenarios never end on the game over screen
+    world.player.take_damage = lambda damage: None
+
+    for frame in range(warmup + frames):
+        # Scenario bookkeeping, not timed
+        while world.sprite_counts()["enemies"] < scenario.enemies:
+            world.spawn_enemy(rng.randint(0, width - 72), rng.randint(-72, height * 2 // 3),
+                              strong=rng.random() < 0.2)
+        if refill:
+            refill()
+        for phase in PHASES:
+            totals[phase] = 0.0
+
+        start = clock()
+        world.step(next(inputs))
+        world.draw(screen, renderer)
+        drawn = clock()
+        renderer.present()
+        end = clock()
+        totals["present"] = end - drawn
+        elapsed = end - start
+
+        if frame >= warmup:
+            pixels += renderer.pixels_pushed
+            per_frame.append(elapsed)
+            for phase in PHASES:
+                per_phase[phase].append(totals[phase])
+
+    return {
+        "description": scenario.description,
+        "variant": scenario.variant,
+        "frames": frames,
+        "frame": _summary(per_frame),
+        "phases": {phase: _summary(per_phase[phase]) for phase in PHASES},
+        "renderer": "dirty" if dirty else "flip",
+        "pixels_per_frame": pixels / frames,
+        "score": world.score,
+        "enemies_at_end": world.sprite_counts()["enemies"],
+        "pools": world.pool_stats(),
+    }
+
+
+def time_to_first_frame(script, runs):
+    """Timing summary of launching script until it reports its first frame
+
+    One unmeasured launch goes first, so the OS file cache and the sprite
+    bundle are warm like on any start but the very first.
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    samples = []
+    for run in range(runs + 1):
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, script, "--first-frame"], env=env,
+                                   stdout=subprocess.PIPE, text=True)
+        shown = None
+        for line in process.stdout:
+            if line.startswith("first frame"):
+                shown = time.perf_counter() - start
+        process.wait()
+        if shown is None:
+            raise RuntimeError(f"{script} exited ({process.returncode}) without a first frame")
+        if run:
+            samples.append(shown)
+    return _summary(samples)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, frames, warmup, seed, images, dirty=False, startup_runs=0):
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "frames": frames,
+            "warmup": warmup,
+            "seed": seed,
+            "renderer": "dirty" if dirty else "flip",
+        },
+        "scenarios": {},
+    }
+    if startup_runs:
+        results["startup"] = {}
+        for variant, script in STARTUP_SCRIPTS.items():
+            stats = results["startup"][variant] = time_to_first_frame(script, startup_runs)
+            print(f"startup {variant:<7} first frame mean {stats['mean_ms']:7.1f} ms  "
+                  f"max {stats['max_ms']:7.1f} ms", file=sys.stderr)
+    for name in names:
+        result = run_scenario(name, frames, warmup, seed, images, dirty)
+        results["scenarios"][name] = result
+        frame = result["frame"]
+        print(f"{name:<15} mean {frame['mean_ms']:7.3f} ms  p50 {frame['p50_ms']:7.3f}  "
+              f"p99 {frame['p99_ms']:7.3f}  max {frame['max_ms']:7.3f}  "
+              f"{result['pixels_per_frame']:.0f} px/frame", file=sys.stderr)
+        for phase, stats in result["phases"].items():
+            print(f"    {phase:<12} mean {stats['mean_ms']:7.3f} ms  p99 {stats['p99_ms']:7.3f}",
+                  file=sys.stderr)
+    return results
+
+
+def compare(old_path, new_path):
+    """Print the change in mean and p99 frame time per scenario"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['meta'].get('commit')} -> {new['meta'].get('commit')}")
+    for variant, stats in new.get("startup", {}).items():
+        before = old.get("startup", {}).get(variant)
+        if before:
+            a, b = before["mean_ms"], stats["mean_ms"]
+            print(f"startup {variant:<7} first frame {a:7.1f} -> {b:7.1f} ms ({(b - a) / a * 100:+6.1f}%)")
+    for name, result in new["scenarios"].items():
+        before = old["scenarios"].get(name)
+        if before is None:
+            print(f"{name:<15} (new scenario)")
+            continue
+        line = [f"{name:<15}"]
+        for key in ("mean_ms", "p99_ms"):
+            a, b = before["frame"][key], result["frame"][key]
+            change = (b - a) / a * 100 if a else 0.0
+            line.append(f"{key[:-3]} {a:7.3f} -> {b:7.3f} ms ({change:+6.1f}%)")
+        print("  ".join(line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark frame update and render cost")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default all)")
+    parser.add_argument("--frames", type=int, default=1200, help="measured frames per scenario")
+    parser.add_argument("--warmup", type=int, default=120, help="unmeasured frames first")
+    parser.add_argument("--seed", type=int, default=1942)
+    parser.add_argument("--images", default="*.png",
+                        help="glob of local images for the reddit_scroll scenario")
+    parser.add_argument("--dirty", action="store_true",
+                        help="present with dirty rects instead of full flips")
+    parser.add_argument("--startup", type=int, default=0, metavar="RUNS",
+                        help="also time each game's first frame over RUNS fresh launches")
+    parser.add_argument("--out", help="write JSON results here (default stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two result files instead of running")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    images = sorted(glob.glob(args.images))
+    results = run(args.scenario or list(SCENARIOS), args.frames, args.warmup, args.seed, images,
+                  args.dirty, args.startup)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""
+The 1942 clone's engine: one world, sprites and main loop shared by every
+game, with the rules, screen size and background as settings.
+
+    world.py        World (and the NumPy SwarmWorld): update, collisions, render
+    rules.py        Rules, and the CLASSIC and REDDIT presets
+    backgrounds.py  background providers: stars, Reddit, a local directory
+    app.py          the windowed main loop the launchers call
+    sprites.py      bullets, enemies, the player and their images
+
+plus the pieces they are built from (assets, atlas, audio, pools, spatial,
+waves, recording, telemetry, ...). Nothing is imported here, so tools like
+hitches.py can use one module without loading pygame; import the modules
+you need, e.g. `from engine.world import make_world`.
+"""
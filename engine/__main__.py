@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+    python -m engine   # rebuild the sprite bundle (see assets.py)
+"""
+from .headless_init import init  # dummy display, for convert_alpha without a window
+from .assets import main
+
+init()
+main()
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+The windowed main loop both games run.
+
+game.py and game_reddit_background.py only say which rules they play by
+(see rules.py), what their window is called and which background and
+music they start with; the command line, the window, the fixed-timestep
+loop, the F2-F6 keys, recording and the start-up order all live here.
+
+    python game.py --background ~/Pictures/space --resolution 1280x720
+"""
+import argparse
+import gc
+import os
+import sys
+from functools import partial
+
+import pygame
+from .assets import cache
+from .audio import audio
+from .backgrounds import StarfieldBackground, directory_background, reddit_background
+from .dirty import DirtyRenderer
+from .inputs import Inputs
+from .profiler import profiler, Overlay
+from .recording import Recorder
+from .sprites import SPRITE_ASSETS, SPRITE_BUNDLE
+from .telemetry import Telemetry
+from .timestep import FixedTimestep, SIM_HZ
+from .waves import load as load_waves
+from .world import EntityStore, make_world, variant_rules
+
+FPS = 120  # default render rate; the simulation always runs at SIM_HZ
+
+
+def background_factory(source, buffer_mb=32, compress=False):
+    """Provider factory for --background: "stars", "reddit" or a directory of images"""
+    if source == "stars":
+        return StarfieldBackground
+    options = {"buffer_bytes": buffer_mb * 1024 * 1024, "compress": compress}
+    if source == "reddit":
+        return partial(reddit_background, **options)
+    if os.path.isdir(source):
+        return partial(directory_background, path=source, **options)
+    raise ValueError(f"--background: {source!r} is not stars, reddit or a directory")
+
+
+def _resolution(text):
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, not {text!r}")
+    return width, height
+
+
+def parse_args(title, background, swarm):
+    parser = argparse.ArgumentParser(description=title)
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help="render rate cap, 0 for uncapped (game speed doesn't change)")
+    parser.add_argument("--dirty", action="store_true", help="start in dirty-rect mode (F2)")
+    parser.add_argument("--seed", type=int, help="play a specific game (default random)")
+    parser.add_argument("--record", metavar="FILE", help="record inputs for replay.py")
+    parser.add_argument("--telemetry", metavar="FILE",
+                        help="record per-frame timings and events for hitches.py")
+    parser.add_argument("--resolution", type=_resolution, metavar="WxH",
+                        help="window size instead of the game's own")
+    parser.add_argument("--background", default=background, metavar="SOURCE",
+                        help=f"stars, reddit or a directory of images (default {background})")
+    parser.add_argument("--bg-buffer-mb", type=int, default=32,
+                        help="memory for queued background images")
+    parser.add_argument("--compress-bg", action="store_true",
+                        help="zlib-compress queued background images")
+    if swarm:
+        parser.add_argument("--swarm", type=int, metavar="N",
+                            help="stress mode: N enemies per wave, simulated with NumPy")
+    parser.add_argument("--waves", metavar="FILE",
+                        help="wave schedule (.json or .toml, see waves.py) instead of the classic one")
+    parser.add_argument("--first-frame", action="store_true",
+                        help="quit once the first frame is shown (startup timing, see bench.py)")
+    args = parser.parse_args()
+    if getattr(args, "swarm", None) and EntityStore is None:
+        parser.error("--swarm needs NumPy")
+    try:
+        args.background = background_factory(args.background, args.bg_buffer_mb, args.compress_bg)
+        args.schedule = load_waves(args.waves) if args.waves else None
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    return args
+
+
+def main(variant, title, background="stars", music=None, swarm=False):
+    """Run a game until its window is closed
+
+    variant names the world and rules in recordings (see world.VARIANTS);
+    background is the default --background; music loops once the first
+    frame is up; swarm offers --swarm.
+    """
+    args = parse_args(title, background, swarm)
+    # Everything a replay needs to build the same world again
+    options = {}
+    if args.resolution:
+        options["rules"] = {"width": args.resolution[0], "height": args.resolution[1]}
+    if getattr(args, "swarm", None):
+        variant = "swarm"
+        options["batch"] = args.swarm
+    rules = variant_rules(variant, options.get("rules"))
+
+    pygame.init()
+    # Sounds are registered now and decoded once the first frame is up (audio.py)
+    if audio.init():
+        audio.load("laser", "laser.wav", "weapons", voices=2, priority=1, volume=rules.volume)
+        audio.load("explosion", "explosion.wav", "explosions", voices=3, priority=2,
+                   volume=rules.volume)
+
+    os.environ["SDL_VIDEO_WINDOW_POS"] = "center"
+    screen = pygame.display.set_mode(rules.size)
+    pygame.display.set_caption(title)
+    clock = pygame.time.Clock()
+    cache.preload(SPRITE_ASSETS, SPRITE_BUNDLE)
+
+    world = make_world(variant, args.seed, waves=args.schedule, background=args.background,
+                       **options)
+    if args.waves:
+        options["waves"] = args.waves  # replay.py loads the file again
+    recorder = Recorder(args.record, world, variant, **options) if args.record else None
+    step = recorder.step if recorder else world.step
+    world.interpolate = True
+    telemetry = (Telemetry(args.telemetry, variant=variant, seed=world.seed, fps=args.fps,
+                           size=list(rules.size)) if args.telemetry else None)
+
+    # Renders happen at --fps, game steps at a fixed SIM_HZ in between
+    timestep = FixedTimestep(SIM_HZ)
+    elapsed = 0
+
+    # F2 switches between full flips and dirty rects
+    renderer = DirtyRenderer(screen, enabled=args.dirty)
+
+    # F3 shows where frame time goes (and pixels pushed per frame), F4 writes
+    # a cProfile of the next 5 seconds
+    overlay = Overlay(profiler, renderer)
+    # F5 takes a checkpoint, F6 rewinds to it (not while recording: the
+    # recording couldn't be replayed)
+    checkpoint = None
+
+    running = True
+    restart = False
+    first_frame = True
+    while running:
+        profiler.begin_frame()
+        with profiler.scope("input"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+                    restart = True
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F2:
+                    renderer.toggle()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle()
+                    renderer.invalidate()  # the overlay's old spot needs clearing
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    profiler.capture(seconds=5)
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                    checkpoint = world.snapshot()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F6:
+                    if checkpoint is not None and not recorder:
+                        world.restore(checkpoint)
+                        renderer.invalidate()
+            inputs = Inputs.from_keys(pygame.key.get_pressed(), restart)
+
+        # Run as many steps as the last frame took, then draw in between them
+        steps = timestep.advance(elapsed)
+        for _ in range(steps):
+            step(inputs)
+            inputs.restart = restart = False  # a key press only counts once
+        audio.flush()  # each sound effect starts at most once per frame
+        world.draw(screen, renderer, timestep.alpha)
+        drawn = overlay.draw(screen, world.sprite_counts(), world.pool_stats(),
+                             world.background_bytes())
+        if renderer.enabled:
+            renderer.add(drawn)
+        with profiler.scope("flip"):
+            renderer.present()
+        profiler.end_frame()
+
+        if first_frame:
+            # The game is on screen; only now do what can wait
+            first_frame = False
+            if args.first_frame:
+                print("first frame", flush=True)
+                break
+            world.background.start()  # loader threads, if the background has any
+            audio.preload()
+            if music and audio.enabled:
+                pygame.mixer.music.load(music)
+                pygame.mixer.music.play(-1)
+            # Everything built so far lives for the whole game; freezing it
+            # keeps the collector from rescanning it during play
+            gc.collect()
+            gc.freeze()
+
+        elapsed = clock.tick(args.fps) / 1000
+        if telemetry:
+            telemetry.frame(world, steps, clock.get_fps(), clock.get_rawtime())
+
+    world.background.stop()
+    if recorder:
+        recorder.close()
+        print(f"Recorded {recorder.steps} steps (seed {world.seed}) to {args.record}")
+    if telemetry:
+        telemetry.close()
+        dropped = f", {telemetry.dropped} dropped" if telemetry.dropped else ""
+        print(f"Telemetry: {telemetry.flushed} frames{dropped} to {args.telemetry}")
+    pygame.quit()
+    sys.exit()
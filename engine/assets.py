@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Shared image cache and the prebuilt sprite bundle.
+
+AssetCache loads each image once and hands out the converted surface for
+(path, size); sprites share it, so never draw onto it. preload() can keep
+the scaled images in a bundle of raw RGBA pixels that loads without any
+decoding, and rebuilds it when a source image changes.
+
+    python -m engine   # (re)build the sprite bundle
+"""
+import hashlib
+import json
+import os
+import struct
+import pygame
+
+BUNDLE_MAGIC = b"1942-sprites"
+BUNDLE_VERSION = 3  # 2: stamps are content hashes; 3: plus size and mtime
+_HEADER = struct.Struct("<12sII")  # magic, version, length of the JSON index
+
+
+class AssetCache:
+    """Loads images once and hands out the same converted surface afterwards"""
+    def __init__(self):
+        self._images = {}  # (path, size) -> converted + scaled surface
+        self._fallbacks = set()  # keys holding a fallback instead of the file
+        self.hits = 0
+        self.misses = 0
+        self._restamp = False  # the bundle's stamps have outdated sizes/mtimes
+
+    def image(self, path, size=None, fallback=None):
+        """Return the image at path scaled to size (w, h), loading it on first use
+
+        fallback is called with size when the file can't be loaded and its
+        result is cached in place of the image. Without a fallback the
+        pygame.error is raised like a plain pygame.image.load would.
+        """
+        key = (path, size)
+        surface = self._images.get(key)
+        if surface is not None:
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        try:
+            # The unscaled image is cached too, so other sizes skip the decode
+            raw = self._images.get((path, None))
+            if raw is None:
+                raw = pygame.image.load(_resolve(path)).convert_alpha()
+                self._images[(path, None)] = raw
+            surface = raw if size is None else pygame.transform.scale(raw, size)
+        except (pygame.error, FileNotFoundError):
+            if fallback is None:
+                raise
+            surface = fallback(size)
+            self._fallbacks.add(key)
+        self._images[key] = surface
+        return surface
+
+    def preload(self, specs, bundle=None):
+        """Load a list of (path, size) or (path, size, fallback) entries up front
+
+        With a bundle path, whatever the bundle holds is taken from it, and
+        the bundle is rewritten if anything had to be loaded from its file,
+        or to refresh the stamps of sources that were touched but not changed.
+        """
+        if bundle:
+            self.load_bundle(bundle)
+        misses = self.misses
+        for spec in specs:
+            self.image(*spec)
+        if bundle and (self.misses != misses or self._restamp):
+            try:
+                self.save_bundle(specs, bundle)
+            except (OSError, pygame.error) as error:
+                print(f"Couldn't write sprite bundle {bundle}: {error}")
+
+    def load_bundle(self, path):
+        """Add every still-valid image in the bundle at path; returns how many"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, version, index_size = _HEADER.unpack_from(data)
+            if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+                return 0
+            start = _HEADER.size + index_size
+            index = json.loads(data[_HEADER.size:start])
+        except (OSError, ValueError, struct.error):
+            return 0  # missing or unreadable: preload() writes a new one
+
+        pixels = memoryview(data)[start:]
+        convert = pygame.display.get_surface() is not None
+        loaded = 0
+        unchanged = {}  # path -> _unchanged, a path is usually there at several sizes
+        for entry in index:
+            if entry["path"] not in unchanged:
+                unchanged[entry["path"]] = _unchanged(entry["path"], entry["stamp"])
+            same, touched = unchanged[entry["path"]]
+            if not same:
+                continue  # the file changed since the bundle was built
+            self._restamp |= touched
+            width, height = entry["image"]
+            offset = entry["offset"]
+            surface = pygame.image.frombuffer(pixels[offset:offset + width * height * 4],
+                                              (width, height), "RGBA")
+            # convert_alpha/copy also detaches the surface from the file's bytes
+            surface = surface.convert_alpha() if convert else surface.copy()
+            size = tuple(entry["size"]) if entry["size"] else None
+            self._images[(entry["path"], size)] = surface
+            loaded += 1
+        return loaded
+
+    def save_bundle(self, specs, path):
+        """Write the cached images for specs to a bundle at path"""
+        index, chunks, offset = [], [], 0
+        stamps = {}
+        for spec in specs:
+            key = (spec[0], spec[1])
+            surface = self._images.get(key)
+            if surface is None or key in self._fallbacks:
+                continue
+            raw = pygame.image.tobytes(surface, "RGBA")
+            if key[0] not in stamps:
+                stamps[key[0]] = _stamp(key[0])
+            index.append({"path": key[0], "size": key[1], "image": surface.get_size(),
+                          "offset": offset, "stamp": stamps[key[0]]})
+            chunks.append(raw)
+            offset += len(raw)
+        header = json.dumps(index).encode()
+        temp = path + ".tmp"
+        with open(temp, "wb") as f:
+            f.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(header)))
+            f.write(header)
+            f.writelines(chunks)
+        os.replace(temp, path)  # never leave a half-written bundle behind
+        self._restamp = False
+
+    def clear(self):
+        """Drop every cached surface (needed if the display mode changes)"""
+        self._images.clear()
+        self._fallbacks.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the number of cached surfaces"""
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self._images)}
+
+
+def _resolve(path):
+    """Find path even when the file name only differs in case
+
+    The assets were authored on Windows, so "torpedo.png" is really
+    "Torpedo.png" on disk. Case-sensitive filesystems need the real name.
+    """
+    if os.path.exists(path):
+        return path
+    folder, name = os.path.split(path)
+    try:
+        for entry in os.listdir(folder or "."):
+            if entry.lower() == name.lower():
+                return os.path.join(folder, entry)
+    except OSError:
+        pass
+    return path
+
+
+def _stat(path):
+    """[size, mtime_ns] of the file behind path, or None if it is missing"""
+    try:
+        stat = os.stat(_resolve(path))
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _hash(path):
+    with open(_resolve(path), "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def _stamp(path):
+    """{"stat": [size, mtime_ns], "hash": contents hash} of the file behind path"""
+    stat = _stat(path)
+    if stat is None:
+        return None
+    try:
+        return {"stat": stat, "hash": _hash(path)}
+    except OSError:
+        return None
+
+
+def _unchanged(path, stamp):
+    """(file still matches stamp, but its size or mtime moved)
+
+    The file is only read and hashed when its size or mtime differ from
+    the stamp's, so a launch normally costs one stat per source, and a
+    checkout or copy that only moves the mtime keeps the entry.
+    """
+    stat = _stat(path)
+    if stat is None or not stamp:
+        return False, False
+    if stat == stamp["stat"]:
+        return True, False
+    try:
+        same = _hash(path) == stamp["hash"]
+    except OSError:
+        return False, False
+    return same, same
+
+
+# Shared instance used by the whole engine
+cache = AssetCache()
+
+
+def main():
+    """Rebuild the sprite bundle; needs a display mode (see __main__.py)"""
+    from .sprites import SPRITE_ASSETS, SPRITE_BUNDLE
+    cache.clear()
+    cache.preload(SPRITE_ASSETS)
+    cache.save_bundle(SPRITE_ASSETS, SPRITE_BUNDLE)
+    print(f"wrote {SPRITE_BUNDLE}")
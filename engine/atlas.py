@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Sprite atlas and a layered render queue.
+
+Every sprite image is packed into one RLE-accelerated atlas surface, and
+queued draws go out as one Surface.blits() per layer, lowest layer first.
+"""
+from itertools import repeat
+
+import pygame
+
+
+class Atlas:
+    """Images packed into one surface; area(image) is where each one lives"""
+    def __init__(self, images, padding=1):
+        images = list(dict.fromkeys(images))  # same Surface only once
+        # Shelf packing: tallest first, rows as wide as the widest image allows
+        order = sorted(images, key=lambda image: image.get_height(), reverse=True)
+        width = max(sum(image.get_width() + padding for image in images),
+                    max(image.get_width() for image in images))
+        width = min(width, 2048)
+        self.areas = {}
+        x = y = row_height = 0
+        for image in order:
+            w, h = image.get_size()
+            if x + w > width:
+                x, y = 0, y + row_height + padding
+                row_height = 0
+            self.areas[image] = pygame.Rect(x, y, w, h)
+            x += w + padding
+            row_height = max(row_height, h)
+
+        surface = pygame.Surface((width, y + row_height), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        surface.fill((0, 0, 0, 0))
+        for image, area in self.areas.items():
+            surface.blit(image, area, special_flags=pygame.BLEND_RGBA_MAX)  # exact copy, no blending
+        surface.set_alpha(255, pygame.RLEACCEL)  # 255, not None: None turns blending off
+        self.surface = surface
+
+    def area(self, image):
+        """Rect of image inside the atlas, or None if it isn't packed"""
+        return self.areas.get(image)
+
+
+class RenderQueue:
+    """Blit calls collected per layer and flushed lowest layer first"""
+    def __init__(self, atlas=None):
+        self.atlas = atlas
+        self._layers = {}
+
+    def _items(self, layer):
+        items = self._layers.get(layer)
+        if items is None:
+            items = self._layers[layer] = []
+        return items
+
+    def extend(self, layer, pairs):
+        """Queue many (image, pos) pairs"""
+        items = self._items(layer)
+        if self.atlas is None:
+            items.extend(pairs)
+            return
+        atlas, areas = self.atlas.surface, self.atlas.areas
+        for image, pos in pairs:
+            area = areas.get(image)
+            items.append((atlas, pos, area) if area is not None else (image, pos))
+
+    def extend_image(self, layer, image, positions):
+        """Queue one image at many positions"""
+        area = self.atlas.area(image) if self.atlas else None
+        if area is None:
+            self._items(layer).extend(zip(repeat(image), positions))
+        else:
+            self._items(layer).extend(zip(repeat(self.atlas.surface), positions, repeat(area)))
+
+    def flush(self, screen, rects=None):
+        """One blits() per layer; the drawn rects go into rects if it is a list"""
+        for layer in sorted(self._layers):
+            items = self._layers[layer]
+            if not items:
+                continue
+            if rects is None:
+                screen.blits(items, doreturn=False)
+            else:
+                rects.extend(screen.blits(items))
+            items.clear()
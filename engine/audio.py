@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Sound effects with capped voices and one play per sound per frame.
+
+Each sound plays through its group's reserved channels, at most `voices`
+copies at once. play() only marks a sound as wanted; flush() starts each
+wanted sound once, highest priority first. With no usable mixer
+everything is silent instead of failing.
+
+    audio.load("explosion", "explosion.wav", "explosions", voices=3, priority=2)
+    audio.play("explosion")  # from the game logic, as often as it likes
+    audio.flush()            # once per frame, from the main loop
+"""
+import pygame
+
+# Reserved channels per group, counted from channel 0
+GROUPS = {"weapons": 3, "explosions": 4}
+SPARE_CHANNELS = 4  # left for plain Sound.play() calls
+
+
+class _Effect:
+    __slots__ = ("sound", "path", "group", "voices", "priority", "volume")
+
+    def __init__(self, sound, path, group, voices, priority, volume):
+        self.sound = sound  # None until decoded
+        self.path = path
+        self.group = group
+        self.voices = voices
+        self.priority = priority
+        self.volume = volume
+
+    def decoded(self):
+        if self.sound is None:
+            self.sound = pygame.mixer.Sound(self.path)
+            self.sound.set_volume(self.volume)
+        return self.sound
+
+
+class _Voice:
+    """One reserved channel and what was last started on it"""
+    __slots__ = ("channel", "name", "priority", "started")
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.name = None
+        self.priority = 0
+        self.started = 0
+
+
+class AudioManager:
+    """Loads sound effects once and plays them through reserved channel groups"""
+    def __init__(self):
+        self.enabled = False
+        self.effects = {}  # name -> _Effect
+        self.groups = {}  # group -> [_Voice, ...]
+        self._wanted = set()
+        self._frame = 0
+        # Counters, to see how much coalescing and stealing is going on
+        self.requested = 0
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+
+    def init(self, groups=GROUPS):
+        """Open the mixer and reserve the channel groups; False if there's no audio"""
+        if self.enabled:
+            return True
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error as error:
+            print(f"No audio ({error}), running silent")
+            return False
+        reserved = sum(groups.values())
+        if pygame.mixer.get_num_channels() < reserved + SPARE_CHANNELS:
+            pygame.mixer.set_num_channels(reserved + SPARE_CHANNELS)
+        pygame.mixer.set_reserved(reserved)
+        first = 0
+        for group, count in groups.items():
+            self.groups[group] = [_Voice(pygame.mixer.Channel(i)) for i in range(first, first + count)]
+            first += count
+        self.enabled = True
+        return True
+
+    def load(self, name, path, group, voices=1, priority=0, volume=1.0):
+        """Register a sound under name; the file is decoded later, and only once"""
+        if not self.enabled:
+            return
+        if group not in self.groups:
+            raise ValueError(f"unknown channel group {group!r}")
+        effect = self.effects.get(name)
+        sound = effect.sound if effect is not None and effect.path == path else None
+        if sound is not None:
+            sound.set_volume(volume)
+        self.effects[name] = _Effect(sound, path, group, min(voices, len(self.groups[group])),
+                                     priority, volume)
+
+    def preload(self):
+        """Decode every registered sound now"""
+        for effect in self.effects.values():
+            effect.decoded()
+
+    def play(self, name):
+        """Ask for name at the next flush(); asking again before then changes nothing"""
+        if self.enabled:
+            self.requested += 1
+            self._wanted.add(name)
+
+    def flush(self):
+        """Start everything asked for since the last flush, most important first
+
+        A sound at its voice limit restarts its oldest copy. A full group
+        steals the channel of its lowest-priority, oldest sound, or drops
+        the new one if everything playing matters more.
+        """
+        if not self._wanted:
+            return
+        self._frame += 1
+        effects = self.effects
+        wanted = [(effects[name], name) for name in self._wanted if name in effects]
+        self._wanted.clear()
+        wanted.sort(key=lambda item: item[0].priority, reverse=True)
+        for effect, name in wanted:
+            self._start(effect, name)
+
+    def _start(self, effect, name):
+        voices = self.groups[effect.group]
+        own = [voice for voice in voices if voice.name == name and voice.channel.get_busy()]
+        if len(own) >= effect.voices:
+            voice = min(own, key=lambda voice: voice.started)  # restart its oldest copy
+        else:
+            voice = next((voice for voice in voices if not voice.channel.get_busy()), None)
+            if voice is None:
+                voice = min(voices, key=lambda voice: (voice.priority, voice.started))
+                if voice.priority > effect.priority:
+                    self.dropped += 1
+                    return
+                self.stolen += 1
+        voice.channel.play(effect.decoded())  # stops whatever the channel was playing
+        voice.name = name
+        voice.priority = effect.priority
+        voice.started = self._frame
+        self.played += 1
+
+
+# Shared by everything in the process, like the sprite cache
+audio = AudioManager()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Byte-capped buffer between the background loaders and the game.
+
+BackgroundBuffer queues packed-RGB Background objects, optionally
+zlib-compressed, and blocks producers once max_bytes is queued. SeenUrls
+is a bounded LRU of the urls already handed out.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from queue import Empty, Full
+
+MAX_BYTES = 32 * 1024 * 1024  # about five 1080p RGB images uncompressed
+
+
+class BackgroundBuffer:
+    """Queue-like FIFO of Background objects capped by total bytes
+
+    One item is always accepted into an empty buffer, so an image larger
+    than max_bytes can't stall the loader forever. The decompressed head
+    counts at its full size, which may take the buffer past max_bytes
+    until the game takes it. close() stops the inflater.
+    """
+    def __init__(self, max_bytes=MAX_BYTES, compress=False, level=1):
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.level = level  # zlib level; 1 is fast and already shrinks letterboxes a lot
+        self._items = deque()
+        self._bytes = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self.raw_bytes = 0  # uncompressed size of what is queued, for the report
+        self.high_water = 0
+        if compress:
+            threading.Thread(target=self._inflate, name="background-inflate", daemon=True).start()
+
+    def _inflate(self):
+        """Decompress each image as it reaches the head of the buffer"""
+        while True:
+            with self._cond:
+                while not self._closed and not (self._items and self._items[0].compressed):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                head = self._items[0]
+            pixels = head.pixels()  # outside the lock: zlib releases the GIL too
+            with self._cond:
+                if self._items and self._items[0] is head:  # not taken meanwhile
+                    self._bytes -= head.nbytes
+                    head.data, head.compressed = pixels, False
+                    self._bytes += head.nbytes
+                    self.high_water = max(self.high_water, self._bytes)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def put(self, background, block=True, timeout=None):
+        if self.compress and not background.compressed:
+            background.compress(self.level)  # on the producer's thread, not the game's
+        size = background.nbytes
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._items and self._bytes + size > self.max_bytes:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not block or (remaining is not None and remaining <= 0):
+                    raise Full
+                self._cond.wait(remaining)
+            self._items.append(background)
+            self._bytes += size
+            self.raw_bytes += background.raw_size
+            self.high_water = max(self.high_water, self._bytes)
+            self._cond.notify_all()
+
+    def put_until(self, background, stop_event, poll=0.5):
+        """Block until background is taken; False if stop_event is set first"""
+        while not stop_event.is_set():
+            try:
+                self.put(background, timeout=poll)
+                return True
+            except Full:
+                pass
+        return False
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def get(self, block=True, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._items:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if not block or (remaining is not None and remaining <= 0):
+                    raise Empty
+                self._cond.wait(remaining)
+            background = self._items.popleft()
+            self._bytes -= background.nbytes
+            self.raw_bytes -= background.raw_size
+            self._cond.notify_all()
+            return background
+
+    def empty(self):
+        return not self._items
+
+    def full(self):
+        return self._bytes >= self.max_bytes
+
+    def qsize(self):
+        return len(self._items)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def stats(self):
+        return {
+            "items": len(self._items),
+            "bytes": self._bytes,
+            "raw_bytes": self.raw_bytes,
+            "max_bytes": self.max_bytes,
+            "high_water": self.high_water,
+        }
+
+
+class SeenUrls:
+    """The last max_entries urls handed out, least recently seen dropped first
+
+    Supports `in` and add() like a set.
+    """
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._urls = OrderedDict()
+
+    def __contains__(self, url):
+        return url in self._urls
+
+    def __len__(self):
+        return len(self._urls)
+
+    def add(self, url):
+        self._urls[url] = None
+        self._urls.move_to_end(url)
+        if len(self._urls) > self.max_entries:
+            self._urls.popitem(last=False)
+
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Background providers: what the world draws before any sprite.
+
+The world builds one with factory(width, height, seed) and then only calls:
+
+    update()                              once per simulation step
+    draw(screen, renderer, rects, alpha)  paint the screen (see dirty.py for renderer)
+    start() / stop()                      after the first frame / on exit
+    nbytes(), counts(), queued(), swaps   for the overlay and telemetry
+
+StarfieldBackground, reddit_background and directory_background come with
+the engine; the image providers show stars until their first image arrives.
+"""
+import os
+import random
+import threading
+from queue import Empty
+
+import pygame
+from .background_buffer import BackgroundBuffer, MAX_BYTES
+from .reddit_loader import IMAGE_TYPES, Background, letterbox_bytes, to_surface
+from .scrolling import ScrollingBackground
+try:
+    from .starfield import Starfield, DEFAULT_LAYERS
+except ImportError:  # no NumPy - use the Star objects below instead
+    Starfield = DEFAULT_LAYERS = None
+
+BLACK = (0, 0, 0)
+
+# Past this many stars the dirty-rect renderer just redraws the whole screen
+DIRTY_STAR_LIMIT = 500
+
+SCROLL_SPEED = 1  # pixels per step, fractions are fine
+
+
+def letterbox(image, size, max_height=1440):
+    """Scale image to fit size (max height max_height) and center it on black"""
+    width, height = size
+    scale = min(width / image.get_width(), max_height / image.get_height(), 1)
+    new_w, new_h = int(image.get_width() * scale), int(image.get_height() * scale)
+    image = pygame.transform.smoothscale(image, (new_w, new_h))
+    canvas = pygame.Surface(size)
+    canvas.fill(BLACK)
+    canvas.blit(image, ((width - new_w) // 2, (height - new_h) // 2))
+    return canvas
+
+
+class Star:
+    def __init__(self, width, height, rng=random):
+        self.rng = rng
+        self.width = width
+        self.height = height
+        self.x = rng.randint(0, width)
+        self.y = rng.randint(0, height)
+        self.size = rng.randint(1, 3)   # small to large stars
+        self.speed = rng.uniform(0.5, 2.5)  # parallax scrolling
+        self.brightness = rng.randint(100, 255)  # initial brightness
+        self.twinkle_speed = rng.choice([1, -1])  # direction of brightness change
+
+    def update(self):
+        self.y += self.speed
+        if self.y > self.height:
+            # Recycle star to top
+            self.y = 0
+            self.x = self.rng.randint(0, self.width)
+
+        # Twinkle effect (brightness up and down)
+        self.brightness += self.twinkle_speed * 5
+        if self.brightness >= 255:
+            self.brightness = 255
+            self.twinkle_speed = -1
+        elif self.brightness <= 100:
+            self.brightness = 100
+            self.twinkle_speed = 1
+
+    def draw(self, screen, alpha=None):
+        color = (self.brightness, self.brightness, self.brightness)
+        y = self.y if alpha is None else self.y - self.speed * (1 - alpha)
+        return pygame.draw.circle(screen, color, (int(self.x), int(y)), self.size)
+
+
+class StarList:
+    """Plain list of Star objects, used when NumPy isn't installed"""
+    def __init__(self, width, height, count=100, rng=random):
+        self.stars = [Star(width, height, rng) for _ in range(count)]
+
+    def __len__(self):
+        return len(self.stars)
+
+    def update(self):
+        for star in self.stars:
+            star.update()
+
+    def draw(self, screen, alpha=None):
+        self._rects = [star.draw(screen, alpha) for star in self.stars]
+
+    def dirty_rects(self):
+        return self._rects
+
+
+class StarfieldBackground:
+    """Black space with stars scrolling down
+
+    Vectorized (see starfield.py) when NumPy is around; layers are
+    starfield.py layers and need it.
+    """
+    swaps = 0  # no images, ever
+
+    def __init__(self, width, height, seed=None, layers=None):
+        if Starfield is not None:
+            self.stars = Starfield(width, height, layers or DEFAULT_LAYERS, seed=seed)
+        else:
+            self.stars = StarList(width, height, 100, random.Random(seed))
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def update(self):
+        self.stars.update()
+
+    def draw(self, screen, renderer=None, rects=None, alpha=None):
+        track_stars = rects is not None and len(self.stars) <= DIRTY_STAR_LIMIT
+        if rects is not None and not track_stars:
+            renderer.invalidate()  # too many stars to track one by one
+        if renderer is None or renderer.begin(BLACK):
+            screen.fill(BLACK)
+        self.stars.draw(screen, alpha)
+        if track_stars:
+            rects.extend(self.stars.dirty_rects())
+
+    def nbytes(self):
+        return 0
+
+    def queued(self):
+        return 0
+
+    def counts(self):
+        return {"stars": len(self.stars)}
+
+
+class ScrollingImages:
+    """Images taken from a queue, scrolled in one after the other
+
+    loader fills the queue (RedditLoader, DirectoryLoader, or nothing if
+    the caller fills it itself, like the benchmarks). Queued items are
+    Background objects or Surfaces; only the copy into a Surface
+    (to_surface) happens on the game's thread. resources are closed by
+    stop() once the loader has stopped.
+    """
+    def __init__(self, width, height, queue, seed=None, speed=SCROLL_SPEED,
+                 loader=None, resources=()):
+        self.queue = queue
+        self.loader = loader
+        self.resources = resources
+        # Current and next image pre-composited in one strip, drawn with a single blit
+        self.scroller = ScrollingBackground(width, height, speed)
+        self.stars = StarfieldBackground(width, height, seed)  # until the first image
+        self.swaps = 0
+
+    def start(self):
+        if self.loader is not None:
+            self.loader.start()
+
+    def stop(self):
+        if self.loader is not None:
+            self.loader.stop()
+        for resource in self.resources:
+            resource.close()
+
+    def update(self):
+        scroller = self.scroller
+        if not scroller.has_image:
+            try:
+                scroller.set(to_surface(self.queue.get_nowait()))
+            except Empty:
+                self.stars.update()
+                return
+            self.swaps += 1
+        if scroller.wants_image and not self.queue.empty():
+            scroller.push(to_surface(self.queue.get()))
+            self.swaps += 1
+        scroller.update()  # holds still until there is a next image to scroll in
+
+    def draw(self, screen, renderer=None, rects=None, alpha=None):
+        scroller = self.scroller
+        if not scroller.has_image:
+            self.stars.draw(screen, renderer, rects, alpha)
+            return
+        if renderer is not None:
+            if scroller.changed:
+                renderer.invalidate()
+            # Holding still: clear last frame's rects straight from the strip
+            if not renderer.begin(scroller.view()):
+                return
+        scroller.draw(screen, alpha)
+
+    def nbytes(self):
+        """The scrolling strip plus whatever is queued"""
+        return self.scroller.nbytes() + getattr(self.queue, "nbytes", 0)
+
+    def queued(self):
+        return self.queue.qsize()
+
+    def counts(self):
+        return self.stars.counts() if not self.scroller.has_image else {}
+
+
+class DirectoryLoader:
+    """Keeps out_queue topped up with the images of a directory, in a loop
+
+    Started and stopped like RedditLoader. Files are decoded and
+    letterboxed on the loader's own thread, in a new shuffled order on
+    every pass.
+    """
+    def __init__(self, out_queue, size, path, seed=None, max_height=1440):
+        self.out_queue = out_queue
+        self.size = size
+        self.max_height = max_height
+        self.paths = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_TYPES))
+        self.rng = random.Random(seed)
+        self.stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        if self.paths:
+            self._thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        paths = list(self.paths)
+        while paths and not self.stop_event.is_set():
+            self.rng.shuffle(paths)
+            for path in list(paths):
+                try:
+                    with open(path, "rb") as f:
+                        data = letterbox_bytes(f.read(), self.size, self.max_height)
+                except (pygame.error, OSError, ValueError) as e:
+                    print("Skipping background", path, e)
+                    paths.remove(path)  # don't try it again every pass
+                    continue
+                if not self.out_queue.put_until(Background(path, data, self.size),
+                                                self.stop_event):
+                    return
+
+
+def reddit_background(width, height, seed=None, buffer_bytes=MAX_BYTES, compress=False,
+                      speed=SCROLL_SPEED):
+    """ScrollingImages fed from Reddit, beginning with an image from the disk cache"""
+    from .reddit_cache import RedditCache
+    from .reddit_loader import RedditLoader
+    queue = BackgroundBuffer(buffer_bytes, compress)  # capped by bytes, not images
+    disk_cache = RedditCache()
+    loader = RedditLoader(queue, (width, height), disk_cache=disk_cache)
+    return ScrollingImages(width, height, queue, seed, speed, loader, (queue, disk_cache))
+
+
+def directory_background(width, height, seed=None, path=".", buffer_bytes=MAX_BYTES,
+                         compress=False, speed=SCROLL_SPEED):
+    """ScrollingImages cycling through the .jpg/.png files in path"""
+    queue = BackgroundBuffer(buffer_bytes, compress)
+    loader = DirectoryLoader(queue, (width, height), path, seed)
+    return ScrollingImages(width, height, queue, seed, speed, loader, (queue,))
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Optional dirty-rectangle presentation.
+
+With the renderer enabled the world clears only what it drew last frame,
+and present() updates just the rects drawn this frame. A layer that
+changes the whole picture calls invalidate(), and that frame (like any
+whose rects would cover most of the screen) is a full redraw and flip.
+"""
+import pygame
+
+
+class DirtyRenderer:
+    """Tracks drawn rects per frame and presents either them or the whole screen"""
+    def __init__(self, screen, enabled=False, full_ratio=0.5, max_rects=400):
+        self.screen = screen
+        self.enabled = enabled
+        self.full_ratio = full_ratio  # above this share of the screen just flip
+        self.max_rects = max_rects  # past this many rects one fill/flip is cheaper
+        self.screen_area = screen.get_width() * screen.get_height()
+        self._rects = []  # drawn this frame
+        self._last = []  # drawn last frame, cleared by begin()
+        self._full = True  # next frame must be redrawn and presented whole
+        self._heavy = False  # last frame drew too much to clear rect by rect
+        self._solid_color = None
+        self._solid_surface = None
+        self.pixels_pushed = 0  # pixels sent to the display by the last present()
+        self.total_pixels = 0
+        self.frames = 0
+
+    def toggle(self):
+        """Switch between dirty rects and full flips"""
+        self.enabled = not self.enabled
+        self.invalidate()
+
+    def invalidate(self):
+        """Redraw and present the whole screen this frame and start over next frame"""
+        self._full = True
+
+    def begin(self, background):
+        """Start a frame; return True if the caller must redraw the whole screen
+
+        Otherwise the rects drawn last frame are cleared with background, a
+        colour or a screen-sized Surface.
+        """
+        if not self.enabled or self._full:
+            return True
+        if self._heavy:
+            # Clearing last frame piece by piece would cost more than a fill
+            self._full = True
+            return True
+        if not isinstance(background, pygame.Surface):
+            background = self._solid(background)
+        # One blits() call is much cheaper than a fill() per rect
+        self.screen.blits([(background, rect, rect) for rect in self._last], doreturn=False)
+        return False
+
+    def _solid(self, color):
+        """Screen-sized surface of one colour to clear rects from"""
+        if self._solid_color != color:
+            self._solid_surface = pygame.Surface(self.screen.get_size()).convert()
+            self._solid_surface.fill(color)
+            self._solid_color = color
+        return self._solid_surface
+
+    def add(self, rects):
+        """Record rects drawn this frame
+
+        Layers that can't list what they drew must call invalidate() before
+        begin() instead, so the frame is cleared whole.
+        """
+        self._rects.extend(rects)
+
+    def present(self):
+        """Push this frame to the display"""
+        drawn = self._rects
+        limit = self.screen_area * self.full_ratio
+        self._heavy = (len(drawn) > self.max_rects
+                       or sum(rect[2] * rect[3] for rect in drawn) > limit)
+        full = not self.enabled or self._full or self._heavy
+        if not full:
+            # Old positions have to be pushed too, or sprites leave trails
+            rects = drawn + self._last
+            pushed = sum(rect[2] * rect[3] for rect in rects)
+            full = pushed > limit or len(rects) > self.max_rects
+        if full:
+            pygame.display.flip()
+            pushed = self.screen_area
+        else:
+            pygame.display.update(rects)
+
+        self.pixels_pushed = pushed
+        self.total_pixels += pushed
+        self.frames += 1
+        # Everything drawn this frame has to be cleared next frame
+        self._last = drawn
+        self._rects = []
+        self._full = False
+
+    def average_pixels(self):
+        """Mean pixels pushed per frame since the last call"""
+        average = self.total_pixels / self.frames if self.frames else 0
+        self.total_pixels = 0
+        self.frames = 0
+        return average
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Structure-of-arrays storage for crowds of simple sprites (needs NumPy).
+
+EntityStore keeps every entity's position, velocity, health and kind in
+parallel arrays, live ones packed at the front, so moving, culling and
+collision tests are a few array operations however many there are.
+"""
+import numpy as np
+
+
+class EntityStore:
+    """Moving axis-aligned boxes of a few kinds, stored column-wise
+
+    sizes[kind] is the (width, height) of that kind's box.
+    """
+    def __init__(self, sizes, capacity=256):
+        self.sizes = np.asarray(sizes, dtype=np.float64)
+        self.count = 0
+        self._x = np.zeros(capacity)
+        self._y = np.zeros(capacity)
+        self._vx = np.zeros(capacity)
+        self._vy = np.zeros(capacity)
+        self._health = np.zeros(capacity, dtype=np.int32)
+        self._kind = np.zeros(capacity, dtype=np.int8)
+
+    _COLUMNS = ("_x", "_y", "_vx", "_vy", "_health", "_kind")
+
+    def __len__(self):
+        return self.count
+
+    # Views of the live entities; writes go straight into the store
+    @property
+    def x(self):
+        return self._x[:self.count]
+
+    @property
+    def y(self):
+        return self._y[:self.count]
+
+    @property
+    def vx(self):
+        return self._vx[:self.count]
+
+    @property
+    def vy(self):
+        return self._vy[:self.count]
+
+    @property
+    def health(self):
+        return self._health[:self.count]
+
+    @property
+    def kind(self):
+        return self._kind[:self.count]
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        capacity = len(self._x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in self._COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, kind, x, y, vx=0.0, vy=0.0, health=1):
+        """Add entities; every argument may be a scalar or an array
+
+        Returns how many were added.
+        """
+        arrays = np.broadcast_arrays(kind, x, y, vx, vy, health)
+        added = arrays[0].size
+        self._reserve(added)
+        start, end = self.count, self.count + added
+        for name, values in zip(("_kind", "_x", "_y", "_vx", "_vy", "_health"), arrays):
+            getattr(self, name)[start:end] = values.ravel()
+        self.count = end
+        return added
+
+    def clear(self):
+        self.count = 0
+
+    def remove(self, mask):
+        """Drop the entities where mask is True, keeping the rest in order"""
+        keep = ~mask
+        kept = int(keep.sum())
+        if kept == self.count:
+            return
+        for name in self._COLUMNS:
+            column = getattr(self, name)
+            column[:kept] = column[:self.count][keep]
+        self.count = kept
+
+    def move(self):
+        n = self.count
+        self._x[:n] += self._vx[:n]
+        self._y[:n] += self._vy[:n]
+
+    def cull(self, top=-np.inf, bottom=np.inf):
+        """Remove entities entirely above top or whose top edge is below bottom"""
+        y = self.y
+        self.remove((y + self.sizes[self.kind, 1] < top) | (y > bottom))
+
+    def boxes(self):
+        """x, y, width, height arrays of the live entities"""
+        size = self.sizes[self.kind]
+        return self.x, self.y, size[:, 0], size[:, 1]
+
+    def positions(self, alpha=None):
+        """Integer draw positions as an (n, 2) array
+
+        With alpha, entities are placed that far between their previous
+        step (position minus velocity) and their current one.
+        """
+        x, y = self.x, self.y
+        if alpha is not None:
+            back = alpha - 1
+            x = x + self.vx * back
+            y = y + self.vy * back
+        return np.column_stack((x, y)).astype(np.int32)
+
+    def positions_by_kind(self, alpha=None):
+        """[(kind, [[x, y], ...]), ...] for each kind with live entities"""
+        positions = self.positions(alpha)
+        kinds = self.kind
+        result = []
+        for kind in range(len(self.sizes)):
+            selected = positions[kinds == kind]
+            if len(selected):
+                result.append((kind, selected.tolist()))
+        return result
+
+    def snapshot(self):
+        """Copies of the live entities' columns, for restore()"""
+        return tuple(getattr(self, name)[:self.count].copy() for name in self._COLUMNS)
+
+    def restore(self, snapshot):
+        """Make the store hold exactly what snapshot() returned"""
+        self.count = 0
+        self._reserve(len(snapshot[0]))
+        for name, values in zip(self._COLUMNS, snapshot):
+            getattr(self, name)[:len(values)] = values
+        self.count = len(snapshot[0])
+
+    def state_bytes(self):
+        """Everything stored, for hashing in replays"""
+        return b"".join(getattr(self, name)[:self.count].tobytes() for name in self._COLUMNS)
+
+
+def first_overlaps(a, b, chunk=512):
+    """For each box in a, the index of the first box in b it overlaps, or -1
+
+    a and b are (x, y, width, height) tuples of arrays, as from boxes().
+    Overlap means the same as Rect.colliderect. Work is done `chunk` boxes
+    of a at a time, to keep the temporary matrices small.
+    """
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    result = np.full(len(ax), -1, dtype=np.intp)
+    if not len(ax) or not len(bx):
+        return result
+    b_right, b_bottom = bx + bw, by + bh
+    for start in range(0, len(ax), chunk):
+        end = start + chunk
+        x0, y0 = ax[start:end, None], ay[start:end, None]
+        hits = ((x0 < b_right) & (x0 + aw[start:end, None] > bx)
+                & (y0 < b_bottom) & (y0 + ah[start:end, None] > by))
+        hit = hits.any(axis=1)
+        result[start:end][hit] = hits.argmax(axis=1)[hit]
+    return result
+
+
+def overlapping(boxes, rect):
+    """Mask of boxes overlapping one pygame Rect"""
+    x, y, w, h = boxes
+    return (x < rect.right) & (x + w > rect.x) & (y < rect.bottom) & (y + h > rect.y)
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Dummy SDL drivers, for running the engine with no window and no sound card.
+
+Import this before pygame is initialised (headless.py, the tests and
+`python -m engine` do): SDL picks its drivers at pygame.init().
+"""
+import os
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+# Let Ctrl-C and SIGTERM end the process instead of becoming a QUIT event
+# nobody polls for (batch.py's worker pool relies on this)
+os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+
+import pygame
+
+
+def init(size=(1, 1)):
+    """Initialise pygame and set a dummy display mode
+
+    Sprites need a display mode for convert_alpha. Pass the real screen size
+    if the run should also render frames.
+    """
+    pygame.init()
+    return pygame.display.set_mode(size)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Shared HTTP client for the background loader.
+
+FetchClient keeps one pooled requests Session for all threads, with
+conditional GETs, jittered per-host backoff that honours Retry-After and
+per-host concurrency limits. requests is imported on the first request,
+on a loader thread.
+"""
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def validators_from(response):
+    """Headers to revalidate response's resource later (If-None-Match / If-Modified-Since)"""
+    validators = {}
+    if response.headers.get("ETag"):
+        validators["If-None-Match"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        validators["If-Modified-Since"] = response.headers["Last-Modified"]
+    return validators
+
+
+def retry_after(response):
+    """Seconds the server asked us to wait, or 0"""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return 0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0
+    return max(0.0, when.timestamp() - time.time())
+
+
+class _Host:
+    """Backoff state and connection limit for one host"""
+    def __init__(self, limit):
+        self.slots = threading.BoundedSemaphore(limit)
+        self.failures = 0
+        self.not_before = 0.0  # time.monotonic() before which no request is sent
+
+
+class FetchClient:
+    """Pooled, rate-limit aware GETs shared by all loader threads
+
+    get() returns None instead of a response if it was stopped, or if the
+    host is backing off and the caller asked not to wait (retries=0).
+    """
+    def __init__(self, headers=None, timeout=10, per_host=4, max_retries=4,
+                 backoff_base=1.0, backoff_cap=120.0, stop_event=None):
+        self.headers = headers
+        self._session = None  # made on the first get()
+        self._errors = ()  # requests.RequestException, once requests is imported
+        self.timeout = timeout
+        self.per_host = per_host
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.stop_event = stop_event or threading.Event()
+        self._hosts = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+
+    @property
+    def session(self):
+        """The pooled requests.Session, importing requests on first use"""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max(self.per_host, 8))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                if self.headers:
+                    session.headers.update(self.headers)
+                self._errors = requests.RequestException
+                self._session = session
+            return self._session
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = _Host(self.per_host)
+            return state
+
+    def _wait(self, seconds):
+        """Sleep unless stopped; False if stopped"""
+        return seconds <= 0 or not self.stop_event.wait(seconds)
+
+    def _failed(self, host, response=None):
+        """Push the host's next request back: full jitter, at least Retry-After"""
+        host.failures += 1
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** host.failures))
+        delay = max(delay, retry_after(response))
+        host.not_before = max(host.not_before, time.monotonic() + delay)
+        return delay
+
+    def get(self, url, validators=None, retries=None):
+        """GET url, retrying 429/5xx and connection errors with backoff
+
+        validators come from validators_from() on an earlier response. The
+        last response is returned even if it is still an error; the last
+        connection error is raised.
+        """
+        host = self._host(url)
+        session = self.session
+        retries = self.max_retries if retries is None else retries
+        for attempt in range(retries + 1):
+            wait = host.not_before - time.monotonic()
+            if wait > 0 and (retries == 0 or not self._wait(wait)):
+                return None
+            if self.stop_event.is_set():
+                return None
+            with host.slots:
+                try:
+                    self.requests += 1
+                    response = session.get(url, headers=validators, timeout=self.timeout)
+                except self._errors:
+                    self._failed(host)
+                    if attempt == retries:
+                        raise
+                    continue
+            if response.status_code not in RETRY_STATUSES:
+                host.failures = 0
+                if response.status_code == 304:
+                    self.not_modified += 1
+                return response
+            delay = self._failed(host, response)
+            print(f"{urlsplit(url).netloc} answered {response.status_code}, backing off {delay:.1f}s")
+        return response
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+HUD drawing with cached text.
+
+Fonts are created once, rendered text is cached by (text, font, colour),
+and each HUD slot only renders again when its value changes.
+"""
+from collections import OrderedDict
+import pygame
+
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (text, font, colour), least recently used dropped first"""
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color=WHITE):
+        key = (text, font, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+
+class Hud:
+    """Score/health/enemy labels, health bar and game over screen
+
+    game_over_positions are the top-left corners of the three game over
+    lines; by default they are centred on the screen.
+    """
+    def __init__(self, width, height, game_over_positions=None, text_cache=None):
+        self.width = width
+        self.height = height
+        self.font = pygame.font.Font(None, 36)
+        self.big_font = pygame.font.Font(None, 72)
+        self.text = text_cache or TextCache()
+        self.game_over_positions = game_over_positions
+        self._slots = {}  # slot name -> (value, surface)
+        self._bar = None  # (health, max_health, surface)
+
+    def _label(self, slot, value, template, font=None):
+        """Surface for template.format(value), rebuilt only when value changes"""
+        cached = self._slots.get(slot)
+        if cached is not None and cached[0] == value:
+            return cached[1]
+        surface = self.text.render(font or self.font, template.format(value))
+        self._slots[slot] = (value, surface)
+        return surface
+
+    def _health_bar(self, health, max_health, width=200, height=20):
+        bar = self._bar
+        if bar is None or bar[0] != health or bar[1] != max_health:
+            surface = pygame.Surface((width, height))
+            surface.fill(RED)
+            surface.fill(GREEN, (0, 0, width * health / max_health, height))
+            self._bar = bar = (health, max_health, surface)
+        return bar[2]
+
+    def draw(self, screen, score, health, max_health, enemies):
+        """Labels in the top-left corner with the health bar under them
+
+        Returns the rects drawn, for dirty-rect presentation.
+        """
+        return [
+            screen.blit(self._label("score", score, "Score: {}"), (10, 10)),
+            screen.blit(self._label("health", health, "Health: {}"), (10, 50)),
+            screen.blit(self._label("enemies", enemies, "Enemies: {}"), (10, 90)),
+            screen.blit(self._health_bar(health, max_health), (10, 130)),
+        ]
+
+    def draw_game_over(self, screen, score):
+        lines = (
+            self.text.render(self.big_font, "GAME OVER"),
+            self._label("final_score", score, "Final Score: {}"),
+            self.text.render(self.font, "Press R to restart"),
+        )
+        if self.game_over_positions is not None:
+            return [screen.blit(surface, pos) for surface, pos in zip(lines, self.game_over_positions)]
+        centre_x, centre_y = self.width // 2, self.height // 2
+        return [screen.blit(surface, surface.get_rect(center=(centre_x, centre_y + dy)))
+                for surface, dy in zip(lines, (-50, 20, 60))]
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Per-frame player input shared by both game variants.
+
+The worlds only ever see an Inputs object, so they can be driven by the
+keyboard, a script or a bot in exactly the same way.
+"""
+import pygame
+
+
+class Inputs:
+    """Buttons held during one frame - what the player can do to the world"""
+    __slots__ = ("left", "right", "up", "down", "fire", "restart")
+
+    def __init__(self, left=False, right=False, up=False, down=False,
+                 fire=False, restart=False):
+        self.left = left
+        self.right = right
+        self.up = up
+        self.down = down
+        self.fire = fire
+        self.restart = restart  # R was pressed this frame
+
+    @classmethod
+    def from_keys(cls, keys, restart=False):
+        """Build inputs from pygame.key.get_pressed()"""
+        return cls(keys[pygame.K_LEFT], keys[pygame.K_RIGHT],
+                   keys[pygame.K_UP], keys[pygame.K_DOWN],
+                   keys[pygame.K_SPACE], restart)
+
+    def to_bits(self):
+        """Pack into one byte, one bit per button in __slots__ order (for recordings)"""
+        bits = 0
+        for i, name in enumerate(self.__slots__):
+            if getattr(self, name):
+                bits |= 1 << i
+        return bits
+
+    @classmethod
+    def from_bits(cls, bits):
+        return cls(*(bool(bits >> i & 1) for i in range(len(cls.__slots__))))
+
+
+# Nothing pressed - handy for scripted and headless runs
+NO_INPUT = Inputs()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Object pools for sprites that are spawned and destroyed all the time.
+
+A pooled sprite goes back to its pool when killed and is reset and handed
+out again, so shooting and spawning don't allocate mid-game.
+"""
+import pygame
+
+
+class PooledSprite(pygame.sprite.Sprite):
+    """Sprite that returns itself to its pool when killed
+
+    Subclasses define reset(*args), taking the same arguments as __init__,
+    to set up everything that differs between lives; __init__ should only
+    create what can be reused (image, rect) and then call reset. The pool
+    calls reset when it hands out a free sprite.
+    """
+    pool = None
+
+    def kill(self):
+        super().kill()
+        if self.pool is not None:
+            self.pool.release(self)
+
+
+class SpritePool:
+    """Free list of sprites of one class"""
+    def __init__(self, cls, prefill=0):
+        self.cls = cls
+        self._free = []
+        self.live = 0  # sprites handed out and not yet released
+        self.high_water = 0  # most sprites ever live at the same time
+        self.created = 0  # sprites ever constructed by this pool
+        self.prefill(prefill)
+
+    def prefill(self, count):
+        """Construct sprites up front so the first waves don't allocate"""
+        for _ in range(count):
+            sprite = self.cls(0, 0)
+            sprite.pool = self
+            sprite._pooled = True
+            self._free.append(sprite)
+            self.created += 1
+
+    def acquire(self, *args):
+        """Return a sprite reset with args, reusing a free one if possible"""
+        if self._free:
+            sprite = self._free.pop()
+            sprite.reset(*args)
+        else:
+            sprite = self.cls(*args)
+            sprite.pool = self
+            self.created += 1
+        sprite._pooled = False
+        self.live += 1
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return sprite
+
+    def release(self, sprite):
+        """Give a sprite back; releasing the same sprite twice is ignored"""
+        if sprite._pooled:
+            return
+        sprite._pooled = True
+        self.live -= 1
+        self._free.append(sprite)
+
+    def stats(self):
+        """Return live, free, high-water and created counts"""
+        return {
+            "live": self.live,
+            "free": len(self._free),
+            "high_water": self.high_water,
+            "created": self.created,
+        }
+
+
+def pool_stats(pools):
+    """Stats for a dict of named pools, e.g. {"bullets": bullet_pool}"""
+    return {name: pool.stats() for name, pool in pools.items()}
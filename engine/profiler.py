@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Named timing scopes, an in-game overlay and on-demand cProfile captures.
+
+    with profiler.scope("collision"):
+        ...
+
+Disabled, scope() returns a shared do-nothing context manager. The main
+loop binds F3 to the overlay and F4 to a cProfile capture of the next
+five seconds.
+"""
+import cProfile
+import gc
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import pygame
+
+SCOPES = ("input", "update", "spawn", "collision", "background", "draw", "hud", "flip")
+_NULL = nullcontext()
+
+
+class _Scope:
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.totals[self.name] += time.perf_counter() - self.start
+
+
+class Profiler:
+    """Per-frame scope timings averaged over the last `window` frames"""
+    def __init__(self, enabled=False, window=120):
+        self.enabled = False
+        self.window = window
+        self._frame = dict.fromkeys(SCOPES, 0.0)  # this frame's totals
+        self._scopes = {}  # name -> _Scope writing into _frame
+        self._history = deque(maxlen=window)  # past frames' totals
+        self._frame_starts = deque(maxlen=window + 1)
+        self.gc_collections = [0, 0, 0]  # per generation since enabled
+        self.gc_pause = 0.0  # seconds spent in collections since enabled
+        self._gc_start = 0.0
+        self._capture = None  # cProfile.Profile while capturing
+        self._capture_until = 0.0  # perf_counter deadline of the capture
+        self._capture_path = None
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            gc.callbacks.append(self._on_gc)
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            gc.callbacks.remove(self._on_gc)
+            self._history.clear()
+            self._frame_starts.clear()
+
+    def toggle(self):
+        self.disable() if self.enabled else self.enable()
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        else:
+            self.gc_pause += time.perf_counter() - self._gc_start
+            self.gc_collections[info["generation"]] += 1
+
+    def scope(self, name):
+        """Context manager timing a block under name (free when disabled)"""
+        if not self.enabled:
+            return _NULL
+        scope = self._scopes.get(name)
+        if scope is None:
+            self._frame.setdefault(name, 0.0)
+            scope = self._scopes[name] = _Scope(self._frame, name)
+        return scope
+
+    def begin_frame(self):
+        if self.enabled:
+            self._frame_starts.append(time.perf_counter())
+
+    def end_frame(self):
+        """Close the frame's totals, and the cProfile capture if it is done"""
+        if self.enabled:
+            self._history.append(dict(self._frame))
+            for name in self._frame:
+                self._frame[name] = 0.0
+        if self._capture is not None and time.perf_counter() >= self._capture_until:
+            self._finish_capture()
+
+    def averages(self):
+        """Mean ms per frame for each scope over the window"""
+        count = len(self._history)
+        if not count:
+            return {}
+        return {name: sum(frame.get(name, 0.0) for frame in self._history) / count * 1000
+                for name in self._frame}
+
+    def fps(self):
+        starts = self._frame_starts
+        if len(starts) < 2:
+            return 0.0
+        return (len(starts) - 1) / (starts[-1] - starts[0])
+
+    # --- cProfile capture ---
+
+    @property
+    def capturing(self):
+        return self._capture is not None
+
+    def capture(self, seconds=5.0, path=None):
+        """Run cProfile for the next `seconds`, then dump it to path
+
+        The capture ends with the first frame to finish after that.
+        """
+        if self._capture is not None:
+            return
+        self._capture_path = path or time.strftime("profile-%Y%m%d-%H%M%S.prof")
+        self._capture_until = time.perf_counter() + seconds
+        self._capture = cProfile.Profile()
+        self._capture.enable()
+
+    def _finish_capture(self):
+        self._capture.disable()
+        self._capture.dump_stats(self._capture_path)
+        print(f"Profile written to {self._capture_path}")
+        self._capture = None
+
+
+class Overlay:
+    """Profiler readout in a corner: FPS, per-scope ms, sprite counts, pools, GC
+
+    With a DirtyRenderer (see dirty.py) it also shows the pixels pushed per
+    frame, to compare flips with dirty rects. The text is rebuilt a few
+    times a second, not every frame.
+    """
+    def __init__(self, profiler, renderer=None, pos=(10, 170), refresh_ms=250):
+        self.profiler = profiler
+        self.renderer = renderer
+        self.pos = pos
+        self.refresh_ms = refresh_ms
+        self.font = pygame.font.Font(None, 22)
+        self._panel = None
+        self._built = -refresh_ms
+
+    @property
+    def visible(self):
+        return self.profiler.enabled
+
+    def _build(self, counts, pools, background_bytes):
+        profiler = self.profiler
+        lines = [f"{profiler.fps():6.1f} fps"]
+        lines += [f"{name:<11}{ms:7.3f} ms" for name, ms in profiler.averages().items()]
+        lines.append(" ".join(f"{name} {count}" for name, count in counts.items()))
+        lines += [f"{name:<9}{stats['live']:4d} live {stats['free']:4d} free "
+                  f"{stats['high_water']:4d} peak" for name, stats in pools.items()]
+        if background_bytes:
+            lines.append(f"backgrounds {background_bytes / 2 ** 20:.0f} MB")
+        if self.renderer is not None:
+            mode = "dirty" if self.renderer.enabled else "flip"
+            lines.append(f"{mode} {self.renderer.average_pixels():.0f} px/frame")
+        gen0, gen1, gen2 = profiler.gc_collections
+        lines.append(f"gc {gen0}/{gen1}/{gen2}  {profiler.gc_pause * 1000:.1f} ms")
+        if profiler.capturing:
+            lines.append("cProfile capturing...")
+        rendered = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(surface.get_width() for surface in rendered) + 12
+        panel = pygame.Surface((width, 18 * len(rendered) + 8))
+        panel.set_alpha(190)
+        for i, surface in enumerate(rendered):
+            panel.blit(surface, (6, 4 + 18 * i))
+        self._panel = panel
+
+    def draw(self, screen, counts, pools=None, background_bytes=0):
+        """Draw the overlay if visible; returns the rects drawn
+
+        pools is pool_stats() output (see pools.py), one line per pool.
+        """
+        if not self.visible:
+            return []
+        now = pygame.time.get_ticks()
+        if self._panel is None or now - self._built >= self.refresh_ms:
+            self._build(counts, pools or {}, background_bytes)
+            self._built = now
+        return [screen.blit(self._panel, self.pos)]
+
+
+profiler = Profiler()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Input recordings for exact replays.
+
+A one-line JSON header (variant, seed, step rate) followed by five bytes a
+step: the Inputs bitmask and the CRC32 of world.state_hash() after it.
+
+    python game.py --seed 7 --record session.rec
+    python replay.py session.rec
+"""
+import json
+import struct
+import time
+
+from .timestep import SIM_HZ
+
+MAGIC = "1942-replay"
+# 2: hashes count wave schedule steps instead of the old spawn timer
+# 3: one engine for both games; restarts play their step, bomber health follows the rules
+VERSION = 3
+STEP = struct.Struct("<BI")  # input bits, state hash
+
+
+class Recorder:
+    """Steps world and writes every step's inputs and resulting state hash"""
+    def __init__(self, path, world, variant, flush_bytes=64 * 1024, **options):
+        self.world = world
+        self.flush_bytes = flush_bytes
+        self.steps = 0
+        self._buffer = bytearray()
+        self._file = open(path, "wb")
+        header = {"magic": MAGIC, "version": VERSION, "variant": variant, "seed": world.seed,
+                  "sim_hz": SIM_HZ, "options": options,  # extra world arguments
+                  "recorded": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        self._file.write(json.dumps(header).encode() + b"\n")
+
+    def step(self, inputs):
+        """world.step(inputs), recorded"""
+        self.world.step(inputs)
+        self._buffer += STEP.pack(inputs.to_bits(), self.world.state_hash())
+        self.steps += 1
+        if len(self._buffer) >= self.flush_bytes:
+            self.flush()
+
+    def flush(self):
+        self._file.write(self._buffer)
+        self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+def load(path):
+    """(header, [(input_bits, state_hash), ...]) from a recording"""
+    with open(path, "rb") as f:
+        header = json.loads(f.readline())
+        data = f.read()
+    if header.get("magic") != MAGIC or header.get("version") != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} recording")
+    usable = len(data) - len(data) % STEP.size  # a crash can leave half a step
+    return header, list(STEP.iter_unpack(data[:usable]))
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache for the Reddit background loader.
+
+Downloaded images are kept, least recently used evicted past a size limit,
+and each subreddit's listing with the time it was fetched, so startup can
+show a cached image at once and a fresh or rate-limited listing is reused.
+
+    reddit_cache/index.json           url -> file, size, last use
+    reddit_cache/images/<sha1>.<ext>  raw downloaded bytes
+    reddit_cache/listings/<sub>.json  fetch time, HTTP validators + image urls
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+CACHE_DIR = "reddit_cache"
+MAX_BYTES = 256 * 1024 * 1024  # images kept on disk before LRU eviction
+LISTING_TTL = 60 * 60  # seconds before a subreddit listing is refetched
+
+
+def _write_atomic(path, data):
+    """Write via a temp file so a crash never leaves half a file behind"""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class RedditCache:
+    """Images and listings from Reddit, persisted between runs"""
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_BYTES, listing_ttl=LISTING_TTL):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.listing_ttl = listing_ttl  # a number, or {subreddit: seconds} with a "default" key
+        self.image_dir = os.path.join(root, "images")
+        self.listing_dir = os.path.join(root, "listings")
+        os.makedirs(self.image_dir, exist_ok=True)
+        os.makedirs(self.listing_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index_path = os.path.join(root, "index.json")
+        self._index = self._load_index()  # url -> {"file", "size", "used"}
+        self.hits = 0
+        self.misses = 0
+
+    def _load_index(self):
+        try:
+            with open(self._index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose file was deleted behind our back
+        return {url: entry for url, entry in index.items()
+                if os.path.exists(os.path.join(self.image_dir, entry["file"]))}
+
+    def _save_index(self):
+        _write_atomic(self._index_path, json.dumps(self._index).encode())
+
+    @property
+    def total_bytes(self):
+        return sum(entry["size"] for entry in self._index.values())
+
+    # --- Images ---
+
+    def get_image(self, url):
+        """Cached bytes for url, or None"""
+        with self._lock:
+            entry = self._index.get(url)
+            if entry is None:
+                self.misses += 1
+                return None
+            try:
+                with open(os.path.join(self.image_dir, entry["file"]), "rb") as f:
+                    data = f.read()
+            except OSError:
+                del self._index[url]
+                self.misses += 1
+                return None
+            entry["used"] = time.time()
+            self.hits += 1
+            return data
+
+    def put_image(self, url, data):
+        """Store downloaded bytes for url, evicting old images if over the limit"""
+        ext = os.path.splitext(url.split("?")[0])[1].lower() or ".img"
+        name = hashlib.sha1(url.encode()).hexdigest() + ext
+        with self._lock:
+            _write_atomic(os.path.join(self.image_dir, name), data)
+            self._index[url] = {"file": name, "size": len(data), "used": time.time()}
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = self.total_bytes
+        if total <= self.max_bytes:
+            return
+        for url, entry in sorted(self._index.items(), key=lambda item: item[1]["used"]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.image_dir, entry["file"]))
+            except OSError:
+                pass
+            total -= entry["size"]
+            del self._index[url]
+
+    def random_image(self, exclude=()):
+        """(url, bytes) of some cached image not in exclude, or None"""
+        with self._lock:
+            urls = [url for url in self._index if url not in exclude]
+        random.shuffle(urls)
+        for url in urls:
+            data = self.get_image(url)
+            if data is not None:
+                return url, data
+        return None
+
+    # --- Listings ---
+
+    def _ttl(self, subreddit):
+        ttl = self.listing_ttl
+        if isinstance(ttl, dict):
+            return ttl.get(subreddit, ttl.get("default", LISTING_TTL))
+        return ttl
+
+    def _listing_path(self, subreddit):
+        return os.path.join(self.listing_dir, subreddit.lower() + ".json")
+
+    def _read_listing(self, subreddit):
+        try:
+            with open(self._listing_path(subreddit)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_listing(self, subreddit, allow_stale=False):
+        """Image urls last fetched for subreddit, or None if missing or stale
+
+        allow_stale returns the listing whatever its age, for when Reddit
+        won't give us a fresh one.
+        """
+        listing = self._read_listing(subreddit)
+        if listing is None:
+            return None
+        if not allow_stale and time.time() - listing["fetched"] > self._ttl(subreddit):
+            return None
+        return listing["urls"]
+
+    def listing_validators(self, subreddit):
+        """Conditional GET headers for the stored listing ({} if none)"""
+        listing = self._read_listing(subreddit)
+        return listing.get("validators", {}) if listing else {}
+
+    def put_listing(self, subreddit, urls, validators=None):
+        listing = {"fetched": time.time(), "urls": urls, "validators": validators or {}}
+        with self._lock:
+            _write_atomic(self._listing_path(subreddit), json.dumps(listing).encode())
+
+    def touch_listing(self, subreddit):
+        """Mark the stored listing fresh again (the server said 304 Not Modified)"""
+        listing = self._read_listing(subreddit)
+        if listing is not None:
+            self.put_listing(subreddit, listing["urls"], listing.get("validators"))
+
+    def close(self):
+        """Persist last-use times so LRU order survives restarts"""
+        with self._lock:
+            self._save_index()
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+"""
+Background image pipeline for the Reddit game.
+
+One thread picks subreddits and hands out unseen image urls, a thread pool
+downloads them (disk cache first) and another decodes and letterboxes them
+to packed RGB, with Pillow if it is installed and pygame otherwise. The
+game thread only turns a finished Background into a Surface (to_surface).
+"""
+import os
+import random
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import pygame
+from .http_client import FetchClient, validators_from
+from .background_buffer import SeenUrls
+
+_Image = False  # PIL.Image, or None without Pillow; False until first looked up
+
+SUBREDDITS = ["spaceporn", "EarthPorn", "astrophotography"]
+# Point this at a local stand-in server to run the loader offline
+BASE_URL = os.environ.get("REDDIT_BASE_URL", "https://www.reddit.com")
+IMAGE_TYPES = (".jpg", ".jpeg", ".png")
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36"
+}
+
+
+class Background:
+    """A decoded, letterboxed image as packed RGB bytes, ready for to_surface()
+
+    3 bytes a pixel instead of a Surface's 4, and optionally zlib-compressed
+    while it waits in the buffer.
+    """
+    __slots__ = ("url", "data", "size", "compressed")
+
+    def __init__(self, url, data, size):
+        self.url = url
+        self.data = data
+        self.size = size
+        self.compressed = False
+
+    @property
+    def nbytes(self):
+        return len(self.data)
+
+    @property
+    def raw_size(self):
+        return self.size[0] * self.size[1] * 3
+
+    def compress(self, level=1):
+        self.data = zlib.compress(self.data, level)
+        self.compressed = True
+
+    def pixels(self):
+        """Packed RGB bytes, decompressed if needed"""
+        return zlib.decompress(self.data) if self.compressed else self.data
+
+
+def to_surface(background):
+    """Surface for a queued background; Surfaces pass straight through"""
+    if isinstance(background, pygame.Surface):
+        return background
+    return pygame.image.frombuffer(background.pixels(), background.size, "RGB").convert()
+
+
+def letterbox_bytes(data, size, max_height=1440):
+    """Decode image file bytes, scale to fit size (max height max_height) centred on black
+
+    Returns packed RGB bytes of the whole size x size canvas.
+    """
+    width, height = size
+    Image = _pillow()
+    if Image is not None:
+        img = Image.open(BytesIO(data))
+        scale = min(width / img.width, max_height / img.height, 1)
+        new_w, new_h = int(img.width * scale), int(img.height * scale)
+        # JPEGs can be decoded straight at a smaller scale, much cheaper than
+        # resizing after; draft() may shrink img, so the target size comes first
+        img.draft("RGB", (new_w, new_h))
+        img = img.convert("RGB")
+        img = img.resize((new_w, new_h), Image.LANCZOS)
+        canvas = Image.new("RGB", size)
+        canvas.paste(img, ((width - new_w) // 2, (height - new_h) // 2))
+        return canvas.tobytes()
+
+    img = pygame.image.load(BytesIO(data))
+    if img.get_bitsize() not in (24, 32):
+        img = img.convert(32)  # smoothscale only takes 24/32-bit surfaces
+    scale = min(width / img.get_width(), max_height / img.get_height(), 1)
+    new_w, new_h = int(img.get_width() * scale), int(img.get_height() * scale)
+    img = pygame.transform.smoothscale(img, (new_w, new_h))
+    canvas = pygame.Surface(size, 0, 24)
+    canvas.blit(img, ((width - new_w) // 2, (height - new_h) // 2))
+    return pygame.image.tobytes(canvas, "RGB")
+
+
+def _pillow():
+    """PIL.Image if Pillow is installed, else None (imported on first decode)"""
+    global _Image
+    if _Image is False:
+        try:
+            from PIL import Image
+        except ImportError:
+            Image = None
+        _Image = Image
+    return _Image
+
+
+def fetch_listing(client, subreddit, limit, disk_cache=None, base_url=BASE_URL):
+    """Image urls from a subreddit's top posts, from the disk cache while fresh
+
+    A stale cached listing is revalidated with a conditional GET, and used
+    as it is if Reddit rate limits us instead of waiting out the backoff.
+    Returns None if Reddit refused and nothing was cached to fall back on.
+    """
+    stale, validators = None, None
+    if disk_cache:
+        urls = disk_cache.get_listing(subreddit)
+        if urls is not None:
+            return urls
+        stale = disk_cache.get_listing(subreddit, allow_stale=True)
+        if stale is not None:
+            validators = disk_cache.listing_validators(subreddit)
+    url = f"{base_url}/r/{subreddit}/top/.json?limit={limit}&t=month"
+    # With something to fall back on, don't sit in the backoff
+    response = client.get(url, validators, retries=0 if stale is not None else None)
+    if response is not None and response.status_code == 304:
+        disk_cache.touch_listing(subreddit)
+        return stale
+    if response is None or response.status_code != 200:
+        if response is not None and stale is None:
+            print(f"Failed to load Reddit listing, status code: {response.status_code}")
+        return stale
+
+    urls = []
+    for post in response.json()["data"]["children"]:
+        img_url = post["data"].get("url_overridden_by_dest") or post["data"].get("url", "")
+        if img_url.lower().endswith(IMAGE_TYPES):
+            urls.append(img_url)
+    if disk_cache:
+        disk_cache.put_listing(subreddit, urls, validators_from(response))
+    return urls
+
+
+def fetch_image(client, url, disk_cache=None):
+    """Raw image bytes, from the disk cache if we downloaded them before
+
+    Returns None if the download was stopped or failed.
+    """
+    data = disk_cache.get_image(url) if disk_cache else None
+    if data is None:
+        response = client.get(url)
+        if response is None or response.status_code != 200:
+            return None
+        data = response.content
+        if disk_cache:
+            disk_cache.put_image(url, data)
+    return data
+
+
+class RedditLoader:
+    """Keeps out_queue topped up with Background objects from Reddit
+
+    At most `ahead` images are downloaded or decoded beyond what the queue
+    can take, so nothing is fetched only to be thrown away.
+    """
+    def __init__(self, out_queue, size, subreddits=SUBREDDITS, limit=50, disk_cache=None,
+                 downloaders=4, decoders=2, max_height=1440, per_listing=3,
+                 client=None, base_url=BASE_URL, ahead=3, seen_urls=2000):
+        self.out_queue = out_queue
+        self.size = size
+        self.subreddits = subreddits
+        self.limit = limit
+        self.disk_cache = disk_cache
+        self.max_height = max_height
+        self.per_listing = per_listing  # urls taken from a listing before switching subreddit
+        self.used_urls = SeenUrls(seen_urls)  # bounded, long sessions may see a url again
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.base_url = base_url
+        self.client = client or FetchClient(HEADERS, stop_event=self.stop_event)
+        self._slots = threading.Semaphore(ahead)
+        self._downloads = ThreadPoolExecutor(downloaders, thread_name_prefix="reddit-download")
+        self._decodes = ThreadPoolExecutor(decoders, thread_name_prefix="reddit-decode")
+        self._thread = threading.Thread(target=self._listings, daemon=True)
+
+    def start(self, from_cache=True):
+        """Start the pipeline; from_cache first queues a cached background, if any"""
+        if from_cache and self.disk_cache:
+            self._slots.acquire()
+            self._decodes.submit(self._cached)
+        self._thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._downloads.shutdown(cancel_futures=True)
+        self._decodes.shutdown(cancel_futures=True)
+        self.client.close()
+
+    def _claim(self, url):
+        """Mark url as used; False if someone already had it"""
+        with self.lock:
+            if url in self.used_urls:
+                return False
+            self.used_urls.add(url)
+            return True
+
+    def from_cache(self):
+        """A Background from the disk cache, or None if there is none yet"""
+        while self.disk_cache:
+            with self.lock:
+                cached = self.disk_cache.random_image(exclude=self.used_urls)
+            if cached is None:
+                return None
+            url, data = cached
+            self._claim(url)
+            try:
+                return Background(url, letterbox_bytes(data, self.size, self.max_height), self.size)
+            except (pygame.error, OSError, ValueError):
+                continue  # unreadable file, already marked used so it isn't picked again
+        return None
+
+    def _cached(self):
+        try:
+            background = self.from_cache()
+            if background is not None:
+                self.out_queue.put_until(background, self.stop_event)
+        finally:
+            self._slots.release()
+
+    # --- Stage 1: listings ---
+
+    def _listings(self):
+        while not self.stop_event.is_set():
+            try:
+                urls = fetch_listing(self.client, random.choice(self.subreddits), self.limit,
+                                     self.disk_cache, self.base_url)
+            except Exception as e:
+                print("Failed to fetch Reddit listing, retrying...", e)
+                self.stop_event.wait(5)
+                continue
+            if urls is None:
+                self.stop_event.wait(1)  # the client already backed off; don't spin
+                continue
+            random.shuffle(urls)
+            taken = 0
+            for url in urls:
+                if taken == self.per_listing or self.stop_event.is_set():
+                    break
+                if not self._claim(url):
+                    continue
+                # Wait for room so we only download what the queue can take
+                while not self._slots.acquire(timeout=0.5):
+                    if self.stop_event.is_set():
+                        return
+                self._downloads.submit(self._download, url)
+                taken += 1
+            if not taken:
+                self.stop_event.wait(1)  # every url in this listing was used already
+
+    # --- Stage 2: downloads ---
+
+    def _download(self, url):
+        try:
+            data = fetch_image(self.client, url, self.disk_cache)
+        except Exception as e:
+            print("Failed to download Reddit image", url, e)
+            data = None
+        if data is None or self.stop_event.is_set():
+            self._slots.release()
+            return
+        self._decodes.submit(self._decode, url, data)
+
+    # --- Stage 3: decode ---
+
+    def _decode(self, url, data):
+        try:
+            background = Background(url, letterbox_bytes(data, self.size, self.max_height), self.size)
+        except Exception as e:
+            print("Failed to decode Reddit image", url, e)
+        else:
+            self.out_queue.put_until(background, self.stop_event)
+        finally:
+            self._slots.release()
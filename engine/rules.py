@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Gameplay rules and screen size, as data.
+
+Everything the two games do differently is a Rules setting; CLASSIC and
+REDDIT are their presets.
+
+    rules = REDDIT.replace(width=1280, height=720)
+"""
+
+# (dx, dy) of the game over lines from the screen centre, as the Reddit
+# game has always drawn them
+REDDIT_GAME_OVER = ((-200, -50), (-100, 20), (-100, 60))
+
+
+class Rules:
+    """How a game plays and how big its screen is"""
+    def __init__(self, width=600, height=1200, fighter_speed=(1, 3), bomber_speed=(0.5, 2),
+                 bomber_hits=1, fighter_score=100, bomber_score=100, piercing=False,
+                 muzzle=0, player_speed=5, player_health=100, shot_delay=250, crash_damage=25,
+                 game_over_overlay=False, game_over_offsets=None, volume=1.0):
+        self.width = width
+        self.height = height
+        self.fighter_speed = tuple(fighter_speed)  # px/step, drawn uniformly per enemy
+        self.bomber_speed = tuple(bomber_speed)
+        self.bomber_hits = bomber_hits  # bullets it takes to bring a bomber down
+        self.fighter_score = fighter_score
+        self.bomber_score = bomber_score
+        self.piercing = piercing  # a bullet hits every enemy it overlaps, not just the first
+        self.muzzle = muzzle  # where torpedoes start, relative to the ship's top edge
+        self.player_speed = player_speed  # px/step
+        self.player_health = player_health
+        self.shot_delay = shot_delay  # ms between torpedoes
+        self.crash_damage = crash_damage  # health an enemy takes off when it hits the player
+        # Keep the game moving and drawn under the game over text, instead
+        # of a black screen
+        self.game_over_overlay = game_over_overlay
+        self.game_over_offsets = game_over_offsets  # see REDDIT_GAME_OVER; None centres them
+        self.volume = volume  # sound effects
+
+    @property
+    def size(self):
+        return (self.width, self.height)
+
+    def replace(self, **changes):
+        """A copy with some settings changed; unknown names are an error"""
+        unknown = set(changes) - set(vars(self))
+        if unknown:
+            raise ValueError(f"unknown rules: {', '.join(sorted(unknown))}")
+        return Rules(**dict(vars(self), **changes))
+
+    def game_over_positions(self):
+        """Top-left corners of the game over lines for Hud, or None to centre them"""
+        if self.game_over_offsets is None:
+            return None
+        centre_x, centre_y = self.width // 2, self.height // 2
+        return [(centre_x + dx, centre_y + dy) for dx, dy in self.game_over_offsets]
+
+
+# game.py: tall window, bombers go down in one hit
+CLASSIC = Rules()
+
+# game_reddit_background.py: 1080p, faster enemies, three-hit bombers worth
+# 300, bullets that hit everything they touch
+REDDIT = Rules(width=1920, height=1080, fighter_speed=(2, 4), bomber_speed=(1.5, 2),
+               bomber_hits=3, bomber_score=300, piercing=True, muzzle=-8,
+               game_over_overlay=True, game_over_offsets=REDDIT_GAME_OVER, volume=0.5)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Vertically scrolling background presented with one blit.
+
+The current image and the one scrolling in share a strip twice the
+screen height, and each frame copies one screen-sized window out of it.
+Images are not kept once copied in; with no next image the background
+holds still.
+"""
+import pygame
+
+BLACK = (0, 0, 0)
+
+
+class ScrollingBackground:
+    """A screen-sized window onto a pre-composited 2x-height strip
+
+        strip y 0..H    upcoming image (enters from the top)
+        strip y H..2H   current image
+
+    The window sits H - offset pixels down; when offset reaches H the
+    upcoming half is scrolled into the current one. Offsets are floats,
+    and draw() takes the fixed-timestep alpha.
+    """
+    def __init__(self, width, height, speed=1.0, fill=BLACK):
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.strip = pygame.Surface((width, height * 2))
+        if pygame.display.get_surface() is not None:
+            self.strip = self.strip.convert()
+        self.strip.fill(fill)
+        self.offset = 0.0  # 0..height, how far the current image has scrolled down
+        self.shown = 0  # images that have been the current one
+        self.scrolling = False  # the top half holds an image scrolling in
+        self.changed = True  # visible pixels differ from the last draw()
+
+    @property
+    def has_image(self):
+        return self.shown > 0
+
+    @property
+    def wants_image(self):
+        """True if push() would take another image now"""
+        return not self.scrolling
+
+    def set(self, image):
+        """Show image immediately, dropping any transition"""
+        self.strip.blit(image, (0, self.height))
+        self.shown += 1
+        self.offset = 0.0
+        self.scrolling = False
+        self.changed = True
+
+    def push(self, image):
+        """Start image scrolling in; False if one is already on its way"""
+        if not self.wants_image:
+            return False
+        if not self.has_image:
+            self.set(image)
+        else:
+            self.strip.blit(image, (0, 0))  # top half isn't on screen while holding still
+            self.scrolling = True
+        return True
+
+    def update(self):
+        if not self.scrolling:
+            return
+        self.offset += self.speed
+        self.changed = True
+        if self.offset < self.height:
+            return
+        # The upcoming image has fully scrolled in and becomes the current one
+        self.strip.scroll(0, self.height)  # top half down into the bottom, in place
+        self.shown += 1
+        self.offset = 0.0
+        self.scrolling = False
+
+    def _window(self, alpha=None):
+        offset = self.offset
+        if alpha is not None and self.scrolling:
+            # Between the last step and this one, like the sprites (timestep.interpolate)
+            offset = max(offset - self.speed * (1 - alpha), 0.0)
+        return pygame.Rect(0, self.height - int(offset), self.width, self.height)
+
+    def view(self, alpha=None):
+        """The visible window as a subsurface of the strip (no copy)"""
+        return self.strip.subsurface(self._window(alpha))
+
+    def draw(self, screen, alpha=None):
+        """Copy the visible window to screen; returns the rect drawn"""
+        self.changed = False
+        return screen.blit(self.strip, (0, 0), self._window(alpha))
+
+    def nbytes(self):
+        """Memory held: the strip, and no images besides"""
+        return self.strip.get_bytesize() * self.width * self.height * 2
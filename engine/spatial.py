@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Uniform-grid spatial hash used as the collision broadphase.
+
+Objects are bucketed by the grid cells their rects cover, so a query only
+tests the few objects sharing those cells. The default 128 px cell keeps
+every sprite, up to the 72 px TIE bomber, in at most four cells.
+"""
+
+CELL_SIZE = 128
+
+
+class SpatialHash:
+    """Buckets objects with a .rect by the grid cells they overlap"""
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        # Cells hold dicts rather than sets so queries come back in insertion
+        # order, which keeps collision results deterministic
+        self._cells = {}  # (cx, cy) -> {obj: None}
+        self._spans = {}  # obj -> (x0, y0, x1, y1) cell range it is stored in
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __contains__(self, obj):
+        return obj in self._spans
+
+    def __iter__(self):
+        """Stored objects, oldest (re)insert first: the order every cell holds them in"""
+        return iter(self._spans)
+
+    def _span(self, rect):
+        size = self.cell_size
+        # right/bottom are exclusive in pygame, hence the -1
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def insert(self, obj):
+        """Add obj using its current rect"""
+        span = self._span(obj.rect)
+        self._spans[obj] = span
+        cells = self._cells
+        x0, y0, x1, y1 = span
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = bucket = {}
+                bucket[obj] = None
+
+    def remove(self, obj):
+        """Take obj out of the grid; unknown objects are ignored"""
+        span = self._spans.pop(obj, None)
+        if span is None:
+            return
+        cells = self._cells
+        x0, y0, x1, y1 = span
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells[(cx, cy)]
+                del bucket[obj]
+                if not bucket:
+                    del cells[(cx, cy)]
+
+    def update(self, obj):
+        """Re-bucket obj after it moved; cheap when it stayed in the same cells"""
+        span = self._spans.get(obj)
+        if span is None:
+            self.insert(obj)
+        elif span != self._span(obj.rect):
+            self.remove(obj)
+            self.insert(obj)
+
+    def sync(self, objects):
+        """Update every object in objects and drop anything no longer in it
+
+        Call once a frame after moving a sprite group so kills and spawns
+        from anywhere in the loop are picked up.
+        """
+        seen = set()
+        for obj in objects:
+            self.update(obj)
+            seen.add(obj)
+        if len(seen) != len(self._spans):
+            for obj in [obj for obj in self._spans if obj not in seen]:
+                self.remove(obj)
+
+    def clear(self):
+        self._cells.clear()
+        self._spans.clear()
+
+    def query(self, rect):
+        """Return the stored objects whose rect overlaps rect"""
+        cells = self._cells
+        size = self.cell_size
+        x0, y0 = rect.left // size, rect.top // size
+        x1, y1 = (rect.right - 1) // size, (rect.bottom - 1) // size
+        if x0 == x1 and y0 == y1:
+            # Common case: the query fits in one cell, no duplicates possible
+            bucket = cells.get((x0, y0))
+            if not bucket:
+                return []
+            return [obj for obj in bucket if rect.colliderect(obj.rect)]
+        found = {}
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for obj in bucket:
+                        if obj not in found and rect.colliderect(obj.rect):
+                            found[obj] = None
+        return list(found)
+
+    def query_pairs(self, others):
+        """Yield (other, obj) for every other in others overlapping a stored obj
+
+        Removing obj from the grid while iterating is fine; the next other
+        won't see it.
+        """
+        for other in others:
+            for obj in self.query(other.rect):
+                if obj in self._spans:
+                    yield other, obj
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Sprites shared by every game: torpedoes, TIE fighters and bombers, and the
+Millennium Falcon.
+
+Enemies get their speed and health from the world, and the player its
+bounds, speed, health and fire rate from the rules (see rules.py), so both
+games use these classes.
+"""
+import pygame
+from .assets import cache
+from .audio import audio
+from .pools import PooledSprite
+
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+
+
+def bomber_fallback(size):
+    """Red square used when the TIE bomber image is missing"""
+    image = pygame.Surface(size)
+    image.fill(RED)
+    return image
+
+def falcon_fallback(size):
+    """Triangle used when the Millennium Falcon image is missing"""
+    image = pygame.Surface(size, pygame.SRCALPHA)
+    points = [(32, 0), (0, 64), (64, 64)]  # Triangle shape
+    pygame.draw.polygon(image, GREEN, points)
+    return image
+
+# Every sprite image, so they can all be decoded once before the game starts
+SPRITE_ASSETS = [
+    ("torpedo.png", (8, 16)),
+    ("tie_fighter.png", (64, 64)),
+    ("tie_bomber.png", (72, 72), bomber_fallback),
+    ("millennium_falcon.png", (64, 64), falcon_fallback),
+]
+# The same images pre-scaled in one file, so startup needn't decode the PNGs
+SPRITE_BUNDLE = "sprites.bundle"
+
+
+class Bullet(PooledSprite):
+    """A bullet that moves up the screen"""
+    def __init__(self, x, y):
+        super().__init__()
+        self.image = cache.image("torpedo.png", (8, 16))
+        self.rect = self.image.get_rect()
+        self.speed = 8
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        """Place the bullet's top centre at (x, y)"""
+        self.rect.centerx = x
+        self.rect.y = y
+        self.prev_pos = self.rect.topleft  # nothing to interpolate from yet
+
+    def update(self):
+        """Move bullet up the screen"""
+        self.rect.y -= self.speed
+        if self.rect.bottom < 0:
+            self.kill()  # back to the pool
+
+
+class Enemy(PooledSprite):
+    """A TIE fighter moving down the screen
+
+    The world culls it once it has left the bottom of the screen.
+    """
+    strong = False
+
+    def __init__(self, x, y, speed=0, health=1):
+        super().__init__()
+        self.image = self.load_image()
+        self.rect = self.image.get_rect()
+        self.reset(x, y, speed, health)
+
+    @staticmethod
+    def load_image():
+        return cache.image("tie_fighter.png", (64, 64))
+
+    def reset(self, x, y, speed=0, health=1):
+        """Start a new enemy at (x, y); the world draws speed from its rules"""
+        self.rect.x = x
+        self.rect.y = y
+        self.prev_pos = self.rect.topleft
+        self.speed = speed
+        self.health = health  # hits left
+
+    def update(self):
+        self.rect.y += self.speed
+
+    def take_damage(self, damage=1):
+        self.health -= damage
+        return self.health <= 0  # True if dead
+
+
+class EnemyStrong(Enemy):
+    """A TIE bomber: bigger, slower, and it may take more than one hit"""
+    strong = True
+
+    @staticmethod
+    def load_image():
+        return cache.image("tie_bomber.png", (72, 72), bomber_fallback)
+
+
+class Player(pygame.sprite.Sprite):
+    """Player class representing spaceship
+
+    Kept inside the rules' screen, and to its bottom three quarters.
+    """
+    def __init__(self, x, y, rules):
+        super().__init__()
+        # Millennium Falcon image (cached, so restarts don't reload it)
+        self.image = cache.image("millennium_falcon.png", (64, 64), falcon_fallback)
+        self.rect = self.image.get_rect()
+        self.width, self.height = rules.size
+        self.muzzle = rules.muzzle  # torpedoes start this far below the ship's top edge
+
+        self.speed = rules.player_speed
+        self.shot_delay = rules.shot_delay  # Minimum milliseconds between shots
+        self.max_health = rules.player_health
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        """Back to full health at (x, y), ready to fire, for a new game"""
+        self.rect.topleft = (x, y)
+        self.prev_pos = self.rect.topleft
+        self.last_shot = 0  # When we last shot
+        self.health = self.max_health
+
+    def update(self, inputs):
+        """Update player position based on the held directions"""
+        rect = self.rect
+        if inputs.left and rect.left > 0:
+            rect.x -= self.speed
+        if inputs.right and rect.right < self.width:
+            rect.x += self.speed
+        if inputs.up and rect.top > self.height // 4:
+            rect.y -= self.speed
+        if inputs.down and rect.bottom < self.height:
+            rect.y += self.speed
+
+    def shoot(self, bullets, pool, current_time):
+        """Create a new bullet if enough time has passed
+
+        current_time is the world's clock in milliseconds, not wall time, so
+        the fire rate is the same however fast the simulation runs.
+        """
+        if current_time - self.last_shot > self.shot_delay:
+            bullets.add(pool.acquire(self.rect.centerx, self.rect.top + self.muzzle))
+            audio.play("laser")
+            self.last_shot = current_time
+
+    def take_damage(self, damage):
+        """Reduce player health, never below zero"""
+        self.health = max(0, self.health - damage)
+
+    def is_alive(self):
+        return self.health > 0
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized starfield (needs NumPy).
+
+Every star property lives in a NumPy array: one update moves, recycles and
+twinkles all the stars, and drawing writes their pixels straight into the
+screen through surfarray.
+"""
+import numpy as np
+import pygame
+
+# (count, min speed, max speed, min size, max size, min brightness, max brightness)
+# Sizes are circle radii, speeds pixels per frame, brightness 0-255 grey.
+DEFAULT_LAYERS = [
+    (100, 0.5, 2.5, 1, 3, 100, 255),  # same look as the Star objects of the no-NumPy fallback
+]
+
+# Deep parallax field for stress runs: dim slow dust at the back, a few big
+# bright stars up front
+PARALLAX_LAYERS = [
+    (7000, 0.2, 0.5, 1, 1, 50, 140),
+    (2500, 0.6, 1.2, 1, 2, 90, 200),
+    (500, 1.5, 3.0, 2, 3, 140, 255),
+]
+
+TWINKLE_STEP = 5  # brightness change per frame
+
+
+def _circle_offsets(radius):
+    """Pixel offsets pygame.draw.circle fills for radius, as two int arrays
+
+    Taken from pygame itself so vectorized stars look exactly like the
+    circles they replace.
+    """
+    size = radius * 2 + 3
+    stamp = pygame.Surface((size, size), depth=32)
+    stamp.fill((0, 0, 0))
+    pygame.draw.circle(stamp, (255, 255, 255), (radius + 1, radius + 1), radius)
+    xs, ys = np.nonzero(pygame.surfarray.array2d(stamp))
+    return xs - (radius + 1), ys - (radius + 1)
+
+
+class Starfield:
+    """All stars of every layer, stored as arrays"""
+    def __init__(self, width, height, layers=DEFAULT_LAYERS, seed=None):
+        self.width = width
+        self.height = height
+        self.rng = np.random.default_rng(seed)
+        rng = self.rng
+
+        count = sum(layer[0] for layer in layers)
+        self.x = np.empty(count, np.int32)
+        self.y = np.empty(count, np.float32)
+        self.speed = np.empty(count, np.float32)
+        self.size = np.empty(count, np.int8)
+        self.brightness = np.empty(count, np.int16)
+        self.min_brightness = np.empty(count, np.int16)
+        self.max_brightness = np.empty(count, np.int16)
+        self.twinkle = np.empty(count, np.int16)  # +1 getting brighter, -1 dimmer
+
+        start = 0
+        for n, speed_lo, speed_hi, size_lo, size_hi, bright_lo, bright_hi in layers:
+            end = start + n
+            self.x[start:end] = rng.integers(0, width, n, endpoint=True)
+            self.y[start:end] = rng.integers(0, height, n, endpoint=True)
+            self.speed[start:end] = rng.uniform(speed_lo, speed_hi, n)
+            self.size[start:end] = rng.integers(size_lo, size_hi, n, endpoint=True)
+            self.brightness[start:end] = rng.integers(bright_lo, bright_hi, n, endpoint=True)
+            self.min_brightness[start:end] = bright_lo
+            self.max_brightness[start:end] = bright_hi
+            self.twinkle[start:end] = rng.choice((-1, 1), n)
+            start = end
+
+        # Group star indices by radius once; radii never change
+        self.sizes = [(int(radius), np.flatnonzero(self.size == radius), _circle_offsets(int(radius)))
+                      for radius in np.unique(self.size)]
+        self._lut = None  # grey level -> mapped pixel value for the target surface
+        self._lut_format = None
+        self._drawn_y = self.y.astype(np.int32)  # where draw() last put each star
+
+    def __len__(self):
+        return len(self.x)
+
+    def update(self):
+        """Scroll, recycle and twinkle every star"""
+        y = self.y
+        y += self.speed
+        fallen = y > self.height
+        n = np.count_nonzero(fallen)
+        if n:
+            # Recycle stars that left the bottom back to the top
+            y[fallen] = 0
+            self.x[fallen] = self.rng.integers(0, self.width, n, endpoint=True)
+
+        b = self.brightness
+        b += self.twinkle * TWINKLE_STEP
+        top = b >= self.max_brightness
+        b[top] = self.max_brightness[top]
+        self.twinkle[top] = -1
+        bottom = b <= self.min_brightness
+        b[bottom] = self.min_brightness[bottom]
+        self.twinkle[bottom] = 1
+
+    def _colors(self, screen):
+        fmt = (screen.get_bitsize(), screen.get_masks())
+        if self._lut_format != fmt:
+            self._lut = np.array([screen.map_rgb((g, g, g)) for g in range(256)], np.uint32)
+            self._lut_format = fmt
+        return self._lut
+
+    def draw(self, screen, alpha=None):
+        """Write every star into screen in one pass per star size
+
+        alpha places the stars between the last step and the current one,
+        like timestep.interpolate does for sprites.
+        """
+        y = self.y if alpha is None else self.y - self.speed * (1 - alpha)
+        ys = self._drawn_y = y.astype(np.int32)
+        if screen.get_bytesize() not in (2, 4):
+            # pixels2d can't view 8/24-bit surfaces; go through circle draws
+            self._draw_circles(screen, ys)
+            return
+        lut = self._colors(screen)
+        width, height = screen.get_size()
+        colors = lut[self.brightness]
+        xs = self.x
+        pixels = pygame.surfarray.pixels2d(screen)
+        try:
+            for radius, index, (dxs, dys) in self.sizes:
+                # Every covered pixel of every star of this radius in one write
+                px = (xs[index, None] + dxs).ravel()
+                py = (ys[index, None] + dys).ravel()
+                c = np.repeat(colors[index].astype(pixels.dtype), len(dxs))
+                inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+                pixels[px[inside], py[inside]] = c[inside]
+        finally:
+            del pixels  # unlocks the surface
+
+    def dirty_rects(self):
+        """Bounding boxes of every star as last drawn, as [x, y, w, h] lists"""
+        pad = self.size.astype(np.int32) + 1
+        side = pad * 2 + 1
+        return np.stack((self.x - pad, self._drawn_y - pad, side, side), axis=1).tolist()
+
+    def _draw_circles(self, screen, ys):
+        for x, y, size, b in zip(self.x.tolist(), ys.tolist(), self.size.tolist(),
+                                 self.brightness.tolist()):
+            pygame.draw.circle(screen, (b, b, b), (x, y), size)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Per-frame telemetry, recorded to a file while the game runs.
+
+frame() packs one fixed-size record (timings, steps, sprite counts,
+collisions, spawns, background swaps, garbage collection) into a
+preallocated ring that a background thread writes out in batches.
+
+    python game.py --telemetry run.tlm
+    python hitches.py run.tlm
+"""
+import gc
+import json
+import struct
+import threading
+import time
+
+from .timestep import SIM_HZ
+
+MAGIC = "1942-telemetry"
+VERSION = 1
+# Field names and struct codes of one frame record, in file order
+FIELDS = (
+    ("frame", "I"),      # frames since recording started
+    ("time", "d"),       # seconds since recording started, at the end of the frame
+    ("frame_ms", "f"),   # since the previous frame ended
+    ("work_ms", "f"),    # the same minus clock.tick's sleep
+    ("fps", "f"),        # pygame's clock.get_fps()
+    ("steps", "B"),      # simulation steps run this frame
+    ("enemies", "I"),
+    ("bullets", "I"),
+    ("hits", "H"),       # bullet/enemy collisions this frame
+    ("crashes", "H"),    # enemies that hit the player this frame
+    ("spawned", "H"),    # enemies spawned this frame
+    ("swaps", "B"),      # background images taken off the queue this frame
+    ("queued", "H"),     # background images waiting in the queue
+    ("gc_gen", "b"),     # oldest generation collected this frame, -1 for none
+    ("gc_ms", "f"),      # time spent collecting this frame
+)
+FRAME = struct.Struct("<" + "".join(code for _, code in FIELDS))
+
+
+class Telemetry:
+    """Ring buffer of frame records, flushed to path by a writer thread
+
+    capacity frames are preallocated; the writer wakes every batch frames.
+    If it falls a whole ring behind, frames are dropped (and counted in
+    dropped) rather than blocking the game. header entries (variant,
+    seed, ...) go into the file header.
+    """
+    def __init__(self, path, capacity=4096, batch=256, **header):
+        self.capacity = capacity
+        self.batch = batch
+        self.frames = 0  # records written into the ring
+        self.flushed = 0  # records written to the file
+        self.dropped = 0
+        self._ring = bytearray(capacity * FRAME.size)
+        self._view = memoryview(self._ring)
+        self._file = open(path, "wb")
+        header = {"magic": MAGIC, "version": VERSION, "fields": [name for name, _ in FIELDS],
+                  "format": FRAME.format, "sim_hz": SIM_HZ, **header,
+                  "recorded": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        self._file.write(json.dumps(header).encode() + b"\n")
+
+        self._start = self._last = time.perf_counter()
+        self._totals = (0, 0, 0, 0)  # world's hits, crashes, spawned; background swaps
+        self._gc_gen = -1
+        self._gc_time = 0.0
+        self._gc_started = 0.0
+        gc.callbacks.append(self._on_gc)
+
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        else:
+            self._gc_time += time.perf_counter() - self._gc_started
+            self._gc_gen = max(self._gc_gen, info["generation"])
+
+    def frame(self, world, steps, fps=0.0, work_ms=0.0):
+        """Record the frame that just ended"""
+        now = time.perf_counter()
+        frame_ms = (now - self._last) * 1000
+        self._last = now
+        if self.frames - self.flushed >= self.capacity:
+            self.dropped += 1  # the writer is a whole ring behind
+        else:
+            background = world.background
+            totals = (world.hits, world.crashes, world.spawned, background.swaps)
+            hits, crashes, spawned, swaps = (new - old for new, old in zip(totals, self._totals))
+            self._totals = totals
+            counts = world.sprite_counts()
+            FRAME.pack_into(self._ring, self.frames % self.capacity * FRAME.size,
+                            self.frames, now - self._start, frame_ms, work_ms, fps,
+                            min(steps, 255), counts["enemies"], counts["bullets"],
+                            min(hits, 65535), min(crashes, 65535), min(spawned, 65535),
+                            min(swaps, 255), min(background.queued(), 65535),
+                            self._gc_gen, self._gc_time * 1000)
+            self.frames += 1
+            if self.frames - self.flushed >= self.batch:
+                self._wake.set()
+        self._gc_gen = -1
+        self._gc_time = 0.0
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait()
+            self._wake.clear()
+            self._flush()
+
+    def _flush(self):
+        """Write out every record the game thread has finished"""
+        end = self.frames
+        size = FRAME.size
+        while self.flushed < end:
+            start = self.flushed % self.capacity
+            count = min(end - self.flushed, self.capacity - start)  # up to the ring's end
+            self._file.write(self._view[start * size:(start + count) * size])
+            self.flushed += count
+
+    def close(self):
+        """Write what is left and close the file"""
+        gc.callbacks.remove(self._on_gc)
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._flush()
+        self._file.close()
+
+
+def load(path):
+    """(header, [record dict, ...]) from a telemetry file"""
+    with open(path, "rb") as f:
+        header = json.loads(f.readline())
+        data = f.read()
+    if header.get("magic") != MAGIC or header.get("version") != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} telemetry file")
+    names = header["fields"]
+    record = struct.Struct(header["format"])
+    usable = len(data) - len(data) % record.size  # a crash can leave half a frame
+    return header, [dict(zip(names, values)) for values in record.iter_unpack(data[:usable])]
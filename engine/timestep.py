@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""
+Fixed-timestep clock for the main loops.
+
+Turns how long the last rendered frame took into a whole number of SIM_HZ
+simulation steps, with alpha saying how far the next step is along.
+"""
+
+SIM_HZ = 120  # simulation steps per second; every speed in the game is per step
+
+
+class FixedTimestep:
+    """Accumulates frame time and hands it out in whole steps"""
+    def __init__(self, hz=SIM_HZ, max_steps=10):
+        self.step_seconds = 1 / hz
+        self.accumulator = 0.0
+        # After a long stall (window dragged, breakpoint) don't try to catch
+        # up on everything at once, or each frame gets slower than the last
+        self.max_steps = max_steps
+        self.dropped_steps = 0
+
+    def advance(self, elapsed):
+        """Add elapsed seconds and return how many steps to simulate now"""
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.step_seconds)
+        if steps > self.max_steps:
+            self.dropped_steps += steps - self.max_steps
+            self.accumulator -= (steps - self.max_steps) * self.step_seconds
+            steps = self.max_steps
+        self.accumulator -= steps * self.step_seconds
+        return steps
+
+    @property
+    def alpha(self):
+        """How far between the last step and the next one we are (0-1)"""
+        return self.accumulator / self.step_seconds
+
+
+def remember_positions(groups):
+    """Store each sprite's position before a step, for interpolate()"""
+    for group in groups:
+        for sprite in group:
+            sprite.prev_pos = sprite.rect.topleft
+
+
+def interpolate(sprite, alpha):
+    """Where to draw sprite alpha of the way from its last position to its current one"""
+    x0, y0 = sprite.prev_pos
+    x1, y1 = sprite.rect.topleft
+    return (x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Data-driven enemy waves.
+
+A WaveSchedule comes from a JSON or TOML file (format in WaveSchedule) or
+DEFAULT_SCHEDULE, the classic one enemy every 61 steps, and is compiled
+into a sorted timeline that each step checks with one comparison.
+
+    python game.py --waves waves/ramp.json
+"""
+import json
+import math
+
+try:
+    import tomllib  # Python 3.11+
+except ImportError:  # older Pythons: JSON schedules only
+    tomllib = None
+
+FORMATIONS = ("random", "line", "column", "vee")
+
+DEFAULT_SCHEDULE = {"loop": 61, "waves": [{"at": 61, "count": 1, "bombers": 0.2}]}
+
+
+class Wave:
+    """One wave definition: where its enemies go and how many are bombers"""
+    __slots__ = ("at", "every", "times", "count", "count_step", "max_count",
+                 "formation", "bombers", "spacing")
+
+    def __init__(self, at, every=0, times=None, count=1, count_step=0, max_count=None,
+                 formation="random", bombers=0.2, spacing=80):
+        if formation not in FORMATIONS:
+            raise ValueError(f"unknown formation {formation!r} (expected one of {FORMATIONS})")
+        if at < 1 or every < 0 or count < 0:
+            raise ValueError("wave needs at >= 1, every >= 0 and count >= 0")
+        if times is not None and times > 1 and not every:
+            raise ValueError("wave repeats (times > 1) but has no 'every'")
+        self.at = at
+        self.every = every
+        self.times = times
+        self.count = count
+        self.count_step = count_step
+        self.max_count = max_count
+        self.formation = formation
+        self.bombers = bombers
+        self.spacing = spacing
+
+    def capped(self, count):
+        return count if self.max_count is None else min(count, self.max_count)
+
+    def positions(self, count, width, rng):
+        """[(x, dy), ...]: left edge within 0-width and a y offset (<= 0)"""
+        if self.formation == "random":
+            return [(rng.randint(0, width), 0) for _ in range(count)]
+        if self.formation == "line":
+            if count == 1:
+                return [(width // 2, 0)]
+            return [(round(i * width / (count - 1)), 0) for i in range(count)]
+        x = rng.randint(0, width)
+        if self.formation == "column":
+            return [(x, -i * self.spacing) for i in range(count)]
+        # vee: leader first, then alternating left and right, one rank further back each pair
+        half = self.spacing // 2
+        result = []
+        for i in range(count):
+            rank = (i + 1) // 2
+            side = -1 if i % 2 else 1
+            result.append((min(max(x + side * rank * half, 0), width), -rank * self.spacing))
+        return result
+
+    def spawns(self, count, width, rng):
+        """Yield (x, dy, bomber) for count enemies of this wave"""
+        bombers = self.bombers
+        for x, dy in self.positions(count, width, rng):
+            if bombers <= 0:
+                yield x, dy, False
+            elif bombers >= 1:
+                yield x, dy, True
+            else:
+                yield x, dy, rng.random() < bombers
+
+
+class WaveSchedule:
+    """Waves compiled into a timeline and walked one step at a time
+
+    As a file or dict:
+
+        {"loop": 1200, "loop_scale": 1.5,
+         "waves": [{"at": 60, "count": 6, "formation": "line", "bombers": 0},
+                   {"at": 300, "every": 120, "times": 5, "count": 2, "count_step": 2}]}
+
+    loop (optional) restarts the timeline every `loop` steps, and each pass
+    multiplies the counts by loop_scale. Wave keys, in simulation steps
+    counted from 1:
+
+        at          step of the first spawn
+        every       steps between repeats (default: no repeats)
+        times       number of spawns (default 1, or until the loop ends
+                    if `every` is given)
+        count       enemies per spawn (default 1)
+        count_step  added to count on each repeat (default 0)
+        max_count   cap on count however far it ramps (default none)
+        formation   "random" (default), "line", "column" or "vee"
+        bombers     share of TIE bombers, 0-1 (default 0.2)
+        spacing     pixels between enemies in a column or vee (default 80)
+    """
+    def __init__(self, waves, loop=None, loop_scale=1.0):
+        self.waves = [wave if isinstance(wave, Wave) else Wave(**wave) for wave in waves]
+        if loop is not None and loop < 1:
+            raise ValueError("loop must be at least 1 step")
+        self.loop = loop
+        self.loop_scale = loop_scale
+        self.timeline = self._compile()
+        self.reset()
+
+    @classmethod
+    def from_dict(cls, data):
+        unknown = set(data) - {"waves", "loop", "loop_scale"}
+        if unknown:
+            raise ValueError(f"unknown schedule keys: {', '.join(sorted(unknown))}")
+        return cls(data.get("waves", []), data.get("loop"), data.get("loop_scale", 1.0))
+
+    def _compile(self):
+        """[(step, wave, count), ...] for one pass, sorted by step then file order"""
+        entries = []
+        for index, wave in enumerate(self.waves):
+            times = wave.times
+            if times is None:
+                if not wave.every:
+                    times = 1
+                elif self.loop is None:
+                    raise ValueError(f"wave {index} repeats forever but the schedule has no loop")
+                else:
+                    times = max(0, (self.loop - wave.at) // wave.every + 1)
+            for repeat in range(times):
+                step = wave.at + repeat * wave.every
+                if self.loop is not None and step > self.loop:
+                    break
+                count = wave.capped(wave.count + repeat * wave.count_step)
+                entries.append((step, index, wave, count))
+        entries.sort(key=lambda entry: entry[:2])
+        return [(step, wave, count) for step, _, wave, count in entries]
+
+    def reset(self):
+        """Back to step 0, for a new game"""
+        self.step = 0
+        self.passes = 0
+        self._cursor = 0
+        self._offset = 0
+        self._next = self.timeline[0][0] if self.timeline else math.inf
+
+    def snapshot(self):
+        """Where the schedule is, for restore()"""
+        return (self.step, self.passes, self._cursor, self._offset, self._next)
+
+    def restore(self, state):
+        self.step, self.passes, self._cursor, self._offset, self._next = state
+
+    def advance(self):
+        """Move one step on; returns the (wave, count) pairs due this step"""
+        self.step += 1
+        if self.step < self._next:
+            return ()
+        timeline = self.timeline
+        due = []
+        while self.step >= self._next:
+            _, wave, count = timeline[self._cursor]
+            if self.passes and self.loop_scale != 1:
+                count = wave.capped(round(count * self.loop_scale ** self.passes))
+            if count:
+                due.append((wave, count))
+            self._cursor += 1
+            if self._cursor == len(timeline):
+                if self.loop is None:
+                    self._next = math.inf
+                    break
+                self._cursor = 0
+                self.passes += 1
+                self._offset += self.loop
+            self._next = timeline[self._cursor][0] + self._offset
+        return due
+
+
+def load(path):
+    """WaveSchedule from a .json or .toml file"""
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError(f"{path}: TOML schedules need Python 3.11+ (or use JSON)")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path) as f:
+            data = json.load(f)
+    try:
+        return WaveSchedule.from_dict(data)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"{path}: {error}") from None
+
+
+def default_schedule(count=1, every=DEFAULT_SCHEDULE["loop"]):
+    """The classic pacing: count enemies every 61 steps (or every `every`), 20% bombers"""
+    waves = [dict(DEFAULT_SCHEDULE["waves"][0], at=every, count=count)]
+    return WaveSchedule(waves, every)
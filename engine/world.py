@@ -0,0 +1,545 @@
+# -*- coding: utf-8 -*-
+"""
+The game world: all state, the per-step update and the render, with no
+window or main loop attached.
+
+World plays by a Rules object (see rules.py) and draws whatever
+background provider it is given (see backgrounds.py), so game.py and
+game_reddit_background.py share this one core. SwarmWorld is the NumPy
+stress mode.
+
+    world = make_world("reddit", seed=7)
+"""
+import random
+import zlib
+
+import pygame
+from .assets import cache
+from .atlas import Atlas, RenderQueue
+from .audio import audio
+from .backgrounds import StarfieldBackground
+from .hud import Hud
+from .pools import SpritePool, pool_stats
+from .profiler import profiler
+from .rules import CLASSIC, REDDIT
+from .spatial import SpatialHash
+from .sprites import SPRITE_ASSETS, Bullet, Enemy, EnemyStrong, Player, bomber_fallback
+from .timestep import SIM_HZ, remember_positions, interpolate
+from .waves import default_schedule, load as load_waves
+try:
+    import numpy as np
+    from .entities import EntityStore, first_overlaps, overlapping
+except ImportError:  # no NumPy, no swarm mode
+    EntityStore = None
+
+BLACK = (0, 0, 0)
+
+SWARM_BATCH = 50  # enemies per spawn of the classic schedule in swarm mode
+
+
+class World:
+    """All game state and the per-frame update, independent of the display
+
+    step() advances the game by one frame and draw() renders it, so the
+    same world can be driven by the keyboard or by a script with no window.
+    Needs a display mode (even a dummy one) for the sprite images.
+
+    Everything random comes from streams seeded by seed (a fresh one if
+    None), so the same seed and inputs always play out the same game.
+    Enemies arrive as the wave schedule says (see waves.py): waves is a
+    .json/.toml file, a WaveSchedule, or None for the classic pacing.
+    background is a provider factory (see backgrounds.py), stars by
+    default; it never affects play.
+    """
+    def __init__(self, rules=CLASSIC, seed=None, waves=None, background=None):
+        self.rules = rules
+        self.width, self.height = rules.size
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)  # gameplay: spawns, enemy speeds
+        background_seed = random.Random(self.seed ^ 0x5EED).randrange(2 ** 32)  # looks only
+        if waves is None:
+            waves = default_schedule()
+        elif isinstance(waves, str):
+            waves = load_waves(waves)
+        self.waves = waves
+
+        # Decode every sprite image now so spawning never touches the disk
+        cache.preload(SPRITE_ASSETS)
+
+        # Pools sized for a normal game; they grow on demand past that
+        self.bullet_pool = SpritePool(Bullet, prefill=16)
+        self.enemy_pool = SpritePool(Enemy, prefill=32)
+        self.strong_pool = SpritePool(EnemyStrong, prefill=8)
+
+        self.all_sprites = pygame.sprite.Group()
+        self.enemies_group = pygame.sprite.Group()
+        self.bullets_group = pygame.sprite.Group()
+        self.enemy_grid = SpatialHash()  # collision broadphase for enemies_group
+        # One player for the world's lifetime; restarts reset it in place
+        self.player = Player(self.width // 2 - 32, self.height - 100, rules)
+        self.all_sprites.add(self.player)
+
+        self.background = (background or StarfieldBackground)(self.width, self.height,
+                                                              background_seed)
+        self.hud = Hud(self.width, self.height, rules.game_over_positions())  # fonts built once
+        # Every sprite image in one atlas, drawn with one blits() per layer
+        self.atlas = Atlas([cache.image(*spec) for spec in SPRITE_ASSETS])
+        self.render_queue = RenderQueue(self.atlas)
+        self.sprite_groups = (self.all_sprites, self.bullets_group, self.enemies_group)
+        self.interpolate = False  # keep last positions so draw() can blend steps
+        self.frame = 0
+        self.time_ms = 0  # game clock, advanced a fixed amount per step
+        # Running totals for telemetry (see telemetry.py); restarts don't clear them
+        self.hits = 0  # bullet/enemy collisions
+        self.crashes = 0  # enemies that hit the player
+        self.spawned = 0
+        self.reset()
+
+    def reset(self):
+        """Start a new game, reusing the player and pooled sprites"""
+        self.clear_entities()
+        # Player back at the bottom centre of the screen
+        self.player.reset(self.width // 2 - 32, self.height - 100)
+        self.score = 0
+        self.waves.reset()
+        self.game_over = False
+
+    def clear_entities(self):
+        """Send every enemy and bullet back to its pool"""
+        for sprite in self.enemies_group:
+            sprite.kill()
+        for sprite in self.bullets_group:
+            sprite.kill()
+        self.enemy_grid.clear()
+
+    def reseed(self, seed):
+        """Take gameplay randomness from seed from now on, like a new World(seed=seed)"""
+        self.seed = seed
+        self.rng.seed(seed)
+
+    def snapshot(self):
+        """Everything play depends on, as plain data to restore() later
+
+        Only positions and counters are copied, never sprites or images,
+        so a checkpoint costs about as much as state_hash(). It pickles, so
+        a headless run can hand it to other processes. Restore it into a
+        world of the same variant, rules and waves; the background isn't
+        part of it.
+        """
+        player = self.player
+        enemies = list(self.enemies_group)
+        index = {enemy: i for i, enemy in enumerate(enemies)}
+        return {
+            "frame": self.frame,
+            "time_ms": self.time_ms,
+            "score": self.score,
+            "game_over": self.game_over,
+            "rng": self.rng.getstate(),
+            "waves": self.waves.snapshot(),
+            "player": (player.rect.topleft, player.prev_pos, player.health, player.last_shot),
+            "enemies": [(enemy.strong, enemy.rect.topleft, enemy.prev_pos, enemy.speed,
+                         enemy.health) for enemy in enemies],
+            # The broadphase's order decides which enemy a bullet meets first
+            "grid": [index[enemy] for enemy in self.enemy_grid if enemy in index],
+            "bullets": [(bullet.rect.centerx, bullet.rect.y, bullet.prev_pos)
+                        for bullet in self.bullets_group],
+        }
+
+    def restore(self, state):
+        """Go back to a snapshot(), with sprites from the pools"""
+        self.clear_entities()
+        self.frame = state["frame"]
+        self.time_ms = state["time_ms"]
+        self.score = state["score"]
+        self.game_over = state["game_over"]
+        self.rng.setstate(state["rng"])
+        self.waves.restore(state["waves"])
+
+        player = self.player
+        (player.rect.topleft, player.prev_pos, player.health,
+         player.last_shot) = state["player"]
+
+        enemies = []
+        for strong, (x, y), prev_pos, speed, health in state["enemies"]:
+            enemy = (self.strong_pool if strong else self.enemy_pool).acquire(x, y, speed, health)
+            enemy.prev_pos = prev_pos
+            enemies.append(enemy)
+        self.enemies_group.add(enemies)
+        for i in state["grid"]:
+            self.enemy_grid.insert(enemies[i])
+        for x, y, prev_pos in state["bullets"]:
+            bullet = self.bullet_pool.acquire(x, y)
+            bullet.prev_pos = prev_pos
+            self.bullets_group.add(bullet)
+
+    def step(self, inputs):
+        """Advance the game by one simulation step (1/SIM_HZ seconds)
+
+        On the game over screen only the background moves, until
+        inputs.restart starts a new game in the same step.
+        """
+        self.frame += 1
+        self.time_ms += 1000 / SIM_HZ
+        if self.game_over and inputs.restart:
+            self.reset()
+        if not self.game_over:
+            if self.interpolate:
+                remember_positions(self.sprite_groups)
+            with profiler.scope("update"):  # includes "spawn"
+                self.update(inputs)
+            with profiler.scope("collision"):
+                self.collide()
+        with profiler.scope("background"):
+            self.update_background()
+
+    def update(self, inputs):
+        """Player movement, shooting, spawning and sprite movement"""
+        player = self.player
+        player.update(inputs)
+
+        # Shooting
+        if inputs.fire:
+            player.shoot(self.bullets_group, self.bullet_pool, self.time_ms)
+
+        # Spawn whatever the wave schedule has due this step
+        with profiler.scope("spawn"):
+            for wave, count in self.waves.advance():
+                self.spawn_wave(wave, count)
+
+        self.bullets_group.update()
+
+        # Move and cull enemies in one pass; group iteration walks a copy,
+        # so killing inside is safe
+        height = self.height
+        for enemy in self.enemies_group:
+            enemy.update()
+            if enemy.rect.y > height:
+                enemy.kill()
+
+    def spawn_wave(self, wave, count):
+        """count enemies of wave (a waves.Wave) just above the screen"""
+        for x, dy, bomber in wave.spawns(count, self.width - 64, self.rng):
+            self.spawn_enemy(x, (-40 if bomber else -30) + dy, strong=bomber)
+
+    def spawn_enemy(self, x, y, strong=False):
+        """Add an enemy (or a strong one) with its top-left at (x, y)"""
+        rules = self.rules
+        if strong:
+            enemy = self.strong_pool.acquire(x, y, self.rng.uniform(*rules.bomber_speed),
+                                             rules.bomber_hits)
+        else:
+            enemy = self.enemy_pool.acquire(x, y, self.rng.uniform(*rules.fighter_speed))
+        self.enemies_group.add(enemy)
+        self.spawned += 1
+        return enemy
+
+    def collide(self):
+        """Bullet/enemy and player/enemy collisions
+
+        A bullet is spent on the first enemy it touches, or with piercing
+        rules on every enemy it overlaps.
+        """
+        rules = self.rules
+        player = self.player
+        enemy_grid = self.enemy_grid
+
+        # Re-bucket enemies after they moved (also drops killed ones)
+        enemy_grid.sync(self.enemies_group)
+
+        for bullet in self.bullets_group:
+            hits = enemy_grid.query(bullet.rect)
+            if not hits:
+                continue
+            bullet.kill()
+            for enemy in hits:
+                self.hits += 1
+                if enemy.take_damage():
+                    enemy.kill()
+                    enemy_grid.remove(enemy)
+                    audio.play("explosion")
+                    self.score += rules.bomber_score if enemy.strong else rules.fighter_score
+                if not rules.piercing:
+                    break
+
+        # Enemies that reach the player crash into it
+        for enemy in enemy_grid.query(player.rect):
+            enemy.kill()
+            enemy_grid.remove(enemy)
+            player.take_damage(rules.crash_damage)
+            self.crashes += 1
+
+        if not player.is_alive():
+            self.game_over = True
+
+    def update_background(self):
+        self.background.update()
+
+    def state_hash(self):
+        """CRC of everything that decides how the game plays out, for replays"""
+        player = self.player
+        state = [self.frame, self.score, self.game_over, self.waves.step,
+                 tuple(player.rect), player.health, player.last_shot, self.rng.getstate()[1][-1]]
+        state += [(type(s).__name__, tuple(s.rect), s.speed, s.health) for s in self.enemies_group]
+        state += [tuple(s.rect) for s in self.bullets_group]
+        return zlib.crc32(repr(state).encode())
+
+    def sprite_counts(self):
+        """Live sprites by kind, for the profiler overlay"""
+        return {"enemies": len(self.enemies_group), "bullets": len(self.bullets_group),
+                **self.background.counts()}
+
+    def pool_stats(self):
+        """Live, free and high-water counts of each sprite pool"""
+        return pool_stats({"bullets": self.bullet_pool, "fighters": self.enemy_pool,
+                           "bombers": self.strong_pool})
+
+    def entity_count(self):
+        """Live enemies plus bullets"""
+        return len(self.enemies_group) + len(self.bullets_group)
+
+    def lowest_enemy(self):
+        """(centre x, bottom) of the enemy furthest down the screen, or None"""
+        enemy = max(self.enemies_group, key=lambda enemy: enemy.rect.bottom, default=None)
+        return None if enemy is None else (enemy.rect.centerx, enemy.rect.bottom)
+
+    def background_bytes(self):
+        """Memory held by the background provider"""
+        return self.background.nbytes()
+
+    def draw(self, screen, renderer=None, alpha=None):
+        """Render the current frame (doesn't flip the display)
+
+        With a DirtyRenderer (see dirty.py) only what was drawn last frame
+        is cleared, and everything drawn now is recorded for present().
+        alpha (0-1) draws sprites that far between the previous step and
+        the current one; it needs interpolate switched on.
+        """
+        rects = [] if renderer is not None and renderer.enabled else None
+        with profiler.scope("background"):
+            self.draw_background(screen, renderer, rects, alpha)
+        if not self.game_over or self.rules.game_over_overlay:
+            with profiler.scope("draw"):
+                self.draw_sprites(screen, rects, alpha)
+            with profiler.scope("hud"):
+                self.draw_hud(screen, rects)
+        if self.game_over:
+            with profiler.scope("hud"):
+                self.draw_game_over(screen, rects)
+        if rects is not None:
+            renderer.add(rects)
+
+    def draw_background(self, screen, renderer=None, rects=None, alpha=None):
+        if self.game_over and not self.rules.game_over_overlay:
+            # Just the game over text on black
+            if renderer is None or renderer.begin(BLACK):
+                screen.fill(BLACK)
+            return
+        self.background.draw(screen, renderer, rects, alpha)
+
+    def draw_sprites(self, screen, rects=None, alpha=None):
+        # Player first, then bullets, then enemies on top
+        queue = self.render_queue
+        for layer, group in enumerate(self.sprite_groups):
+            if alpha is None:
+                queue.extend(layer, ((sprite.image, sprite.rect) for sprite in group))
+            else:
+                queue.extend(layer, ((sprite.image, interpolate(sprite, alpha))
+                                     for sprite in group))
+        queue.flush(screen, rects)
+
+    def draw_hud(self, screen, rects=None):
+        player = self.player
+        drawn = self.hud.draw(screen, self.score, player.health, player.max_health,
+                              len(self.enemies_group))
+        if rects is not None:
+            rects.extend(drawn)
+
+    def draw_game_over(self, screen, rects=None):
+        drawn = self.hud.draw_game_over(screen, self.score)
+        if rects is not None:
+            rects.extend(drawn)
+
+
+class SwarmWorld(World):
+    """Stress mode: enemies and bullets live in NumPy entity stores
+
+    Same rules as World, but every spawn of the classic schedule brings
+    `batch` enemies (a wave file sets its own counts), and moving, culling
+    and collisions are array operations (see entities.py), so thousands of
+    enemies and bullets stay cheap. Bullets always stop at the first enemy
+    they touch, and bullets that reach the same enemy in the same step are
+    all spent on it.
+    """
+    FIGHTER, BOMBER = 0, 1
+
+    def __init__(self, rules=CLASSIC, seed=None, batch=SWARM_BATCH, waves=None, background=None):
+        if EntityStore is None:
+            raise RuntimeError("swarm mode needs NumPy")
+        self.batch = batch
+        self.enemies = EntityStore([(64, 64), (72, 72)], capacity=4096)
+        self.bullets = EntityStore([(8, 16)], capacity=1024)
+        super().__init__(rules, seed, default_schedule(batch) if waves is None else waves,
+                         background)
+        self.np_rng = np.random.default_rng(self.seed)
+        self.sprite_groups = (self.all_sprites,)  # just the player
+        self.enemy_images = [cache.image("tie_fighter.png", (64, 64)),
+                             cache.image("tie_bomber.png", (72, 72), bomber_fallback)]
+        self.bullet_image = cache.image("torpedo.png", (8, 16))
+
+    def clear_entities(self):
+        super().clear_entities()
+        self.enemies.clear()
+        self.bullets.clear()
+
+    def reseed(self, seed):
+        super().reseed(seed)
+        self.np_rng = np.random.default_rng(seed)
+
+    def snapshot(self):
+        state = super().snapshot()
+        state["np_rng"] = self.np_rng.bit_generator.state
+        state["enemies"] = self.enemies.snapshot()
+        state["bullets"] = self.bullets.snapshot()
+        return state
+
+    def restore(self, state):
+        enemies, bullets = state["enemies"], state["bullets"]
+        super().restore(dict(state, enemies=[], grid=[], bullets=[]))
+        self.np_rng.bit_generator.state = state["np_rng"]
+        self.enemies.restore(enemies)
+        self.bullets.restore(bullets)
+
+    def update(self, inputs):
+        player = self.player
+        player.update(inputs)
+
+        if inputs.fire and self.time_ms - player.last_shot > player.shot_delay:
+            self.bullets.spawn(0, player.rect.centerx - 4, player.rect.top + player.muzzle, vy=-8)
+            audio.play("laser")
+            player.last_shot = self.time_ms
+
+        with profiler.scope("spawn"):
+            for wave, count in self.waves.advance():
+                self.spawn_wave(wave, count)
+
+        self.bullets.move()
+        self.bullets.cull(top=0)
+        self.enemies.move()
+        self.enemies.cull(bottom=self.height)
+
+    def spawn_wave(self, wave, count):
+        """Random formations are drawn in one go from the NumPy stream"""
+        rules, rng = self.rules, self.np_rng
+        strong = rng.random(count) < wave.bombers
+        speed = np.where(strong, rng.uniform(*rules.bomber_speed, count),
+                         rng.uniform(*rules.fighter_speed, count))
+        if wave.formation == "random":
+            x, dy = rng.integers(0, self.width - 64, count, endpoint=True), 0
+        else:
+            x, dy = np.array(wave.positions(count, self.width - 64, self.rng)).reshape(-1, 2).T
+        self.enemies.spawn(np.where(strong, self.BOMBER, self.FIGHTER), x,
+                           np.where(strong, -40, -30) + dy, vy=speed,
+                           health=np.where(strong, rules.bomber_hits, 1))
+        self.spawned += count
+
+    def spawn_enemy(self, x, y, strong=False):
+        rules = self.rules
+        speed = self.rng.uniform(*(rules.bomber_speed if strong else rules.fighter_speed))
+        self.enemies.spawn(self.BOMBER if strong else self.FIGHTER, x, y, vy=speed,
+                           health=rules.bomber_hits if strong else 1)
+        self.spawned += 1
+
+    def collide(self):
+        rules, enemies, bullets, player = self.rules, self.enemies, self.bullets, self.player
+
+        # Each bullet hits the first enemy it touches
+        targets = first_overlaps(bullets.boxes(), enemies.boxes())
+        hit = targets >= 0
+        if hit.any():
+            self.hits += int(np.count_nonzero(hit))
+            health = enemies.health
+            np.subtract.at(health, targets[hit], 1)
+            killed = health <= 0
+            bullets.remove(hit)
+            if killed.any():
+                bombers = int(np.count_nonzero(enemies.kind[killed] == self.BOMBER))
+                fighters = int(np.count_nonzero(killed)) - bombers
+                enemies.remove(killed)
+                audio.play("explosion")
+                self.score += fighters * rules.fighter_score + bombers * rules.bomber_score
+
+        # Enemies that reach the player
+        crashed = overlapping(enemies.boxes(), player.rect)
+        if crashed.any():
+            enemies.remove(crashed)
+            crashes = int(crashed.sum())
+            self.crashes += crashes
+            for _ in range(crashes):
+                player.take_damage(rules.crash_damage)
+
+        if not player.is_alive():
+            self.game_over = True
+
+    def state_hash(self):
+        player = self.player
+        state = repr([self.frame, self.score, self.game_over, self.waves.step,
+                      tuple(player.rect), player.health, player.last_shot]).encode()
+        return zlib.crc32(self.bullets.state_bytes(), zlib.crc32(self.enemies.state_bytes(),
+                                                                  zlib.crc32(state)))
+
+    def sprite_counts(self):
+        return {"enemies": len(self.enemies), "bullets": len(self.bullets),
+                **self.background.counts()}
+
+    def pool_stats(self):
+        return {}  # entities live in the stores, the sprite pools stay empty
+
+    def entity_count(self):
+        return len(self.enemies) + len(self.bullets)
+
+    def lowest_enemy(self):
+        enemies = self.enemies
+        if not len(enemies):
+            return None
+        bottoms = enemies.y + enemies.sizes[enemies.kind, 1]
+        i = int(np.argmax(bottoms))
+        return (int(enemies.x[i] + enemies.sizes[enemies.kind[i], 0] // 2), int(bottoms[i]))
+
+    def draw_background(self, screen, renderer=None, rects=None, alpha=None):
+        if renderer is not None:
+            renderer.invalidate()  # far too many sprites to track rect by rect
+        super().draw_background(screen, renderer, None, alpha)
+
+    def draw_sprites(self, screen, rects=None, alpha=None):
+        queue = self.render_queue
+        for kind, positions in self.bullets.positions_by_kind(alpha):
+            queue.extend_image(1, self.bullet_image, positions)
+        for kind, positions in self.enemies.positions_by_kind(alpha):
+            queue.extend_image(2, self.enemy_images[kind], positions)
+        super().draw_sprites(screen, rects, alpha)  # the player, then flushes everything
+
+    def draw_hud(self, screen, rects=None):
+        player = self.player
+        drawn = self.hud.draw(screen, self.score, player.health, player.max_health,
+                              len(self.enemies))
+        if rects is not None:
+            rects.extend(drawn)
+
+
+# Every world a recording or a benchmark can ask for by name: class and rules
+VARIANTS = {
+    "game": (World, CLASSIC),
+    "swarm": (SwarmWorld, CLASSIC),
+    "reddit": (World, REDDIT),
+}
+
+
+def variant_rules(variant, overrides=None):
+    """The rules variant plays by, with overrides (a dict of Rules settings) applied"""
+    rules = VARIANTS[variant][1]
+    return rules.replace(**overrides) if overrides else rules
+
+
+def make_world(variant, seed=None, rules=None, **options):
+    """A world of variant; rules is a dict of overrides, options go to the world class"""
+    return VARIANTS[variant][0](variant_rules(variant, rules), seed=seed, **options)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Run the game logic with no window, no sound card and no frame cap.
+
+Import this before anything initialises pygame. The world is stepped as
+fast as Python allows, driven by a script or bot policy.
+
+    python headless.py --frames 100000
+"""
+# Must happen before pygame.init() picks the drivers
+from engine.headless_init import init
+
+import argparse
+import importlib
+import time
+import pygame
+from engine.inputs import Inputs, NO_INPUT
+
+
+def make_world(variant="game", seed=None, **options):
+    """Create a world of variant (see engine.world.VARIANTS) on the dummy display"""
+    from engine.world import make_world, variant_rules
+    init(variant_rules(variant, options.get("rules")).size)
+    return make_world(variant, seed, **options)
+
+
+def scripted(script, loop=True):
+    """Turn [(frames, Inputs), ...] into a per-frame input stream
+
+    The script repeats forever unless loop is False.
+    """
+    while True:
+        for count, inputs in script:
+            for _ in range(count):
+                yield inputs
+        if not loop:
+            return
+
+
+def weave_and_fire():
+    """Default bot: sweep left and right while holding fire, restart on death"""
+    left = Inputs(left=True, fire=True, restart=True)
+    right = Inputs(right=True, fire=True, restart=True)
+    return scripted([(90, left), (90, right)])
+
+
+# Bot policies, for batch.py. A policy is a factory called with the run's
+# random.Random; it returns act(world), which gives the Inputs for the next
+# step. Any importable "module:function" works the same way.
+
+def scripted_policy(script):
+    """Policy playing a fixed [(frames, Inputs), ...] script in a loop"""
+    def factory(rng):
+        stream = scripted(script)
+        return lambda world: next(stream)
+    return factory
+
+
+FIRE = Inputs(fire=True)
+LEFT_FIRE = Inputs(left=True, fire=True)
+RIGHT_FIRE = Inputs(right=True, fire=True)
+
+
+def hunter(rng):
+    """Keep under the enemy furthest down the screen, firing all the time"""
+    def act(world):
+        target = world.lowest_enemy()
+        if target is None:
+            return FIRE
+        dx = target[0] - world.player.rect.centerx
+        if dx < -4:
+            return LEFT_FIRE
+        return RIGHT_FIRE if dx > 4 else FIRE
+    return act
+
+
+def wanderer(rng):
+    """Hold a random direction for a random while, firing all the time"""
+    choices = (LEFT_FIRE, RIGHT_FIRE, FIRE)
+    held, inputs = 0, FIRE
+    def act(world):
+        nonlocal held, inputs
+        if not held:
+            held = rng.randint(20, 120)
+            inputs = rng.choice(choices)
+        held -= 1
+        return inputs
+    return act
+
+
+POLICIES = {
+    "idle": scripted_policy([(1, NO_INPUT)]),
+    "fire": scripted_policy([(1, FIRE)]),
+    "weave": scripted_policy([(90, LEFT_FIRE), (90, RIGHT_FIRE)]),
+    "hunter": hunter,
+    "wander": wanderer,
+}
+
+
+def load_policy(name):
+    """Policy factory by its POLICIES name, or "module:function" for your own"""
+    if name in POLICIES:
+        return POLICIES[name]
+    module, _, function = name.partition(":")
+    if not function:
+        raise ValueError(f"unknown policy {name!r}: use one of {', '.join(POLICIES)} "
+                         "or module:function")
+    return getattr(importlib.import_module(module), function)
+
+
+def run(world, inputs, frames, screen=None):
+    """Step world for frames frames, drawing into screen if one is given
+
+    Returns the wall time taken in seconds.
+    """
+    start = time.perf_counter()
+    for _, frame_inputs in zip(range(frames), inputs):
+        world.step(frame_inputs)
+        if screen is not None:
+            world.draw(screen)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the game with no display")
+    parser.add_argument("--frames", type=int, default=10000, help="frames to simulate")
+    parser.add_argument("--draw", action="store_true", help="also render each frame")
+    parser.add_argument("--seed", type=int, default=None, help="world seed (default random)")
+    parser.add_argument("--variant", default="game", choices=("game", "swarm", "reddit"),
+                        help="which game's rules to play by")
+    parser.add_argument("--waves", metavar="FILE", help="wave schedule file (see waves.py)")
+    args = parser.parse_args()
+
+    world = make_world(args.variant, args.seed, waves=args.waves)
+    screen = pygame.display.get_surface() if args.draw else None
+    elapsed = run(world, weave_and_fire(), args.frames, screen)
+    print(f"{args.frames} frames in {elapsed:.2f}s ({args.frames / elapsed:.0f} frames/s)")
+    print(f"score {world.score}, health {world.player.health}, "
+          f"enemies {world.sprite_counts()['enemies']}, game over {world.game_over}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Find the hitches in a telemetry file and what happened in those frames.
+
+    python hitches.py run.tlm --factor 1.5 --top 30 --csv run.csv
+
+Compares how often each event (spawns, swaps, GC, ...) happens in hitch
+frames with how often it happens at all, then lists the worst hitches.
+"""
+import argparse
+import bisect
+import csv
+import sys
+
+from engine.telemetry import load
+
+# Event kinds: name -> test on a frame record
+EVENTS = {
+    "spawn": lambda frame: frame["spawned"] > 0,
+    "swap": lambda frame: frame["swaps"] > 0,
+    "gc": lambda frame: frame["gc_gen"] >= 0,
+    "gc2": lambda frame: frame["gc_gen"] == 2,
+    "hits": lambda frame: frame["hits"] > 0,
+    "crash": lambda frame: frame["crashes"] > 0,
+    "catch-up": lambda frame: frame["steps"] > 1,  # the frame before was late already
+}
+
+
+def find_hitches(frames, factor=2.0, min_ms=20.0, window=120):
+    """[(frame record, median ms before it), ...] of frames that were hitches
+
+    A hitch took more than factor times the median of the `window` frames
+    before it, and at least min_ms, so a machine that is slow all the time
+    doesn't flag every frame.
+    """
+    recent, ordered, hitches = [], [], []
+    for frame in frames:
+        ms = frame["frame_ms"]
+        if ordered:
+            median = ordered[len(ordered) // 2]
+            if ms > min_ms and ms > factor * median:
+                hitches.append((frame, median))
+        recent.append(ms)
+        bisect.insort(ordered, ms)
+        if len(recent) > window:
+            del ordered[bisect.bisect_left(ordered, recent.pop(0))]
+    return hitches
+
+
+def describe(frame):
+    """What happened in a frame, in words"""
+    events = []
+    if frame["spawned"]:
+        events.append(f"spawned {frame['spawned']}")
+    if frame["swaps"]:
+        events.append(f"background swap ({frame['queued']} queued)")
+    if frame["gc_gen"] >= 0:
+        events.append(f"gc gen {frame['gc_gen']} {frame['gc_ms']:.1f} ms")
+    if frame["hits"]:
+        events.append(f"{frame['hits']} hits")
+    if frame["crashes"]:
+        events.append(f"{frame['crashes']} crashes")
+    if frame["steps"] > 1:
+        events.append(f"{frame['steps']} steps")
+    return ", ".join(events) or "-"
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(header, frames, hitches, top=20, out=sys.stdout):
+    times = sorted(frame["frame_ms"] for frame in frames)
+    seconds = frames[-1]["time"] - frames[0]["time"]
+    print(f"{header.get('variant', '?')} seed {header.get('seed')}, recorded "
+          f"{header.get('recorded')}: {len(frames)} frames in {seconds:.1f}s "
+          f"({len(frames) / seconds if seconds else 0:.1f} fps)", file=out)
+    print(f"frame ms p50 {_percentile(times, 0.5):.2f}  p99 {_percentile(times, 0.99):.2f}  "
+          f"max {times[-1]:.2f}", file=out)
+    print(f"{len(hitches)} hitches ({len(hitches) / len(frames) * 100:.2f}% of frames)",
+          file=out)
+    if not hitches:
+        return
+
+    print(f"\n{'event':<10}{'in hitches':>12}{'in all':>11}{'ratio':>8}", file=out)
+    for name, happened in EVENTS.items():
+        overall = sum(1 for frame in frames if happened(frame)) / len(frames)
+        in_hitches = sum(1 for frame, _ in hitches if happened(frame)) / len(hitches)
+        ratio = f"{in_hitches / overall:8.1f}" if overall else f"{'-':>8}"
+        print(f"{name:<10}{in_hitches * 100:11.1f}%{overall * 100:9.2f}%{ratio}", file=out)
+
+    worst = sorted(hitches, key=lambda hitch: hitch[0]["frame_ms"], reverse=True)[:top]
+    print(f"\n{'frame':>7}{'time s':>9}{'ms':>8}{'median':>8}{'work':>7}  "
+          f"{'enemies':>7}{'bullets':>8}  events", file=out)
+    for frame, median in sorted(worst, key=lambda hitch: hitch[0]["frame"]):
+        print(f"{frame['frame']:7d}{frame['time']:9.2f}{frame['frame_ms']:8.1f}{median:8.1f}"
+              f"{frame['work_ms']:7.0f}  {frame['enemies']:7d}{frame['bullets']:8d}  "
+              f"{describe(frame)}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the hitch frames in a telemetry file")
+    parser.add_argument("telemetry")
+    parser.add_argument("--factor", type=float, default=2.0,
+                        help="hitch: this many times the recent median frame time")
+    parser.add_argument("--min-ms", type=float, default=20.0,
+                        help="never call a frame shorter than this a hitch")
+    parser.add_argument("--top", type=int, default=20, help="worst hitches to list")
+    parser.add_argument("--csv", metavar="FILE", help="also write every frame as CSV")
+    args = parser.parse_args()
+
+    try:
+        header, frames = load(args.telemetry)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    if not frames:
+        parser.error(f"{args.telemetry} has no frames")
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, header["fields"])
+            writer.writeheader()
+            writer.writerows(frames)
+    report(header, frames, find_hitches(frames, args.factor, args.min_ms), args.top)
+
+
+if __name__ == "__main__":
+    main()
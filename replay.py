@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Replay a recording headless, as fast as possible, checking every step.
+
+    python replay.py session.rec                  # verify
+    python replay.py session.rec --draw           # also render each step
+    python replay.py session.rec --profile p.prof # under cProfile
+
+Each step's state hash is compared with the recorded one and the replay
+stops at the first mismatch, so a change that alters gameplay shows up as
+the exact step where it diverged. Exits non-zero on a mismatch.
+"""
+import headless  # must come first: switches SDL to the dummy drivers
+
+import argparse
+import cProfile
+import sys
+import time
+
+import pygame
+from engine.inputs import Inputs
+from engine.recording import load
+
+
+def make_world(variant, seed, options=None):
+    """A world of the recorded variant on a dummy display, plus its screen
+
+    It gets the default starfield; backgrounds don't affect play.
+    """
+    world = headless.make_world(variant, seed, **(options or {}))
+    return world, pygame.display.get_surface()
+
+
+def replay(path, draw=False):
+    """Play path back; returns (steps run, first mismatching step or None, seconds)"""
+    header, steps = load(path)
+    world, screen = make_world(header["variant"], header["seed"], header.get("options"))
+    inputs = [Inputs.from_bits(bits) for bits in range(1 << len(Inputs.__slots__))]
+    start = time.perf_counter()
+    for number, (bits, expected) in enumerate(steps, 1):
+        world.step(inputs[bits])
+        if draw:
+            world.draw(screen)
+        if world.state_hash() != expected:
+            return number, number, time.perf_counter() - start
+    return len(steps), None, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay and verify a recorded session")
+    parser.add_argument("recording")
+    parser.add_argument("--draw", action="store_true", help="render every step as well")
+    parser.add_argument("--profile", metavar="FILE", help="run under cProfile and dump stats here")
+    args = parser.parse_args()
+
+    profile = cProfile.Profile() if args.profile else None
+    if profile:
+        profile.enable()
+    steps, mismatch, elapsed = replay(args.recording, args.draw)
+    if profile:
+        profile.disable()
+        profile.dump_stats(args.profile)
+    pygame.quit()
+
+    rate = steps / elapsed if elapsed else 0
+    if mismatch is not None:
+        print(f"State diverged at step {mismatch} ({elapsed:.2f}s)")
+        sys.exit(1)
+    print(f"{steps} steps replayed and verified in {elapsed:.2f}s ({rate:.0f} steps/s)")
+
+
+if __name__ == "__main__":
+    main()
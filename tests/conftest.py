@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Shared setup: the repo root on sys.path, SDL on its dummy drivers, and the
+repo root as the working directory so the sprite images are found.
+
+    python -m pytest tests
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import engine.headless_init  # before anything initialises pygame
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _in_repo_root(monkeypatch):
+    monkeypatch.chdir(ROOT)
+
+
+@pytest.fixture
+def display():
+    """A dummy display, so images can be converted"""
+    return engine.headless_init.init((600, 1200))
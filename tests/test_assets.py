@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Bundle entries are dropped when their source image's contents change"""
+import os
+
+import pygame
+
+from engine import assets
+from engine.assets import AssetCache
+
+
+def save_png(path, color):
+    image = pygame.Surface((4, 4), pygame.SRCALPHA)
+    image.fill(color)
+    pygame.image.save(image, str(path))
+
+
+def test_bundle_follows_contents_not_mtime(display, tmp_path, monkeypatch):
+    png, bundle = tmp_path / "ship.png", str(tmp_path / "sprites.bundle")
+    specs = [(str(png), (2, 2)), (str(png), (3, 3))]
+    save_png(png, (255, 0, 0, 255))
+    AssetCache().preload(specs, bundle)
+
+    hashed = []
+    hash_file = assets._hash
+    monkeypatch.setattr(assets, "_hash", lambda path: hashed.append(path) or hash_file(path))
+    cache = AssetCache()
+    assert cache.load_bundle(bundle) == 2 and not hashed  # size and mtime match: no hashing
+    assert cache.image(*specs[0]).get_at((0, 0)) == (255, 0, 0, 255)
+
+    os.utime(png, ns=(1, 1))  # touched, same pixels: still valid
+    cache = AssetCache()
+    cache.preload(specs, bundle)  # and the bundle is restamped with the new mtime
+    assert cache.misses == 0 and hashed  # nothing decoded, only hashed
+    hashed.clear()
+    assert AssetCache().load_bundle(bundle) == 2 and not hashed
+
+    save_png(png, (0, 0, 255, 255))  # new pixels
+    os.utime(png, ns=(2, 2))
+    assert AssetCache().load_bundle(bundle) == 0
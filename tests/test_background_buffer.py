@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""BackgroundBuffer holds at most max_bytes and blocks producers past it"""
+import threading
+import time
+from queue import Empty, Full
+
+import pytest
+
+from engine.background_buffer import BackgroundBuffer, SeenUrls
+from engine.reddit_loader import Background
+
+
+def image(name, size=(10, 10)):
+    return Background(name, bytes(size[0] * size[1] * 3), size)
+
+
+def test_byte_cap():
+    buffer = BackgroundBuffer(max_bytes=700)
+    buffer.put(image("a"))
+    buffer.put(image("b"))
+    assert buffer.nbytes == 600 and buffer.qsize() == 2
+    with pytest.raises(Full):
+        buffer.put(image("c"), block=False)
+    with pytest.raises(Full):
+        buffer.put(image("c"), timeout=0.05)
+    assert buffer.get().url == "a"
+    buffer.put(image("c"), block=False)
+    assert [buffer.get_nowait().url for _ in range(2)] == ["b", "c"]
+    with pytest.raises(Empty):
+        buffer.get_nowait()
+
+
+def test_oversized_image_fits_empty_buffer():
+    buffer = BackgroundBuffer(max_bytes=100)
+    buffer.put(image("big"), block=False)
+    assert buffer.nbytes == 300
+    with pytest.raises(Full):
+        buffer.put(image("next"), block=False)
+
+
+def test_get_unblocks_producer():
+    buffer = BackgroundBuffer(max_bytes=300)
+    buffer.put(image("a"))
+    done = threading.Event()
+
+    def produce():
+        buffer.put(image("b"))
+        done.set()
+    thread = threading.Thread(target=produce)
+    thread.start()
+    time.sleep(0.05)
+    assert not done.is_set()  # blocked on the cap
+    buffer.get()
+    thread.join(timeout=2)
+    assert done.is_set() and buffer.get().url == "b"
+
+
+def test_put_until_gives_up_when_stopped():
+    buffer = BackgroundBuffer(max_bytes=300)
+    stop = threading.Event()
+    assert buffer.put_until(image("a"), stop)
+    stop.set()
+    assert not buffer.put_until(image("b"), stop, poll=0.01)
+    assert buffer.qsize() == 1
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_compressed_images_count_compressed_bytes():
+    buffer = BackgroundBuffer(compress=True)
+    try:
+        a, b = image("a", (100, 100)), image("b", (100, 100))
+        buffer.put(a)
+        buffer.put(b)
+        wait_for(lambda: not a.compressed)  # the head is inflated for the game
+        assert b.compressed and buffer.nbytes == 30000 + b.nbytes
+        assert buffer.raw_bytes == 60000
+        assert buffer.get() is a and a.data == bytes(30000)
+        wait_for(lambda: not b.compressed)
+        assert buffer.nbytes == 30000 and buffer.get().pixels() == bytes(30000)
+    finally:
+        buffer.close()
+
+
+def test_seen_urls_forget_oldest():
+    seen = SeenUrls(max_entries=2)
+    for url in ("a", "b", "a", "c"):
+        seen.add(url)
+    assert "a" in seen and "c" in seen and "b" not in seen and len(seen) == 2
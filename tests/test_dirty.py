@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Dirty-rect frames come out pixel-identical to full redraws"""
+import pygame
+import pytest
+
+import headless
+from engine.dirty import DirtyRenderer
+from engine.inputs import Inputs
+
+
+@pytest.mark.parametrize("variant", ["game", "swarm", "reddit"])
+def test_dirty_matches_full_redraw(variant):
+    rules = {"width": 480, "height": 640}
+    full_world = headless.make_world(variant, 3, rules=rules)
+    dirty_world = headless.make_world(variant, 3, rules=rules)
+    screen = pygame.display.get_surface()
+    full_screen = screen.copy()
+    full = DirtyRenderer(full_screen)
+    dirty = DirtyRenderer(screen, enabled=True)
+    for frame in range(400):
+        inputs = headless.LEFT_FIRE if frame % 120 < 60 else headless.RIGHT_FIRE
+        if frame == 300:
+            full_world.player.health = dirty_world.player.health = 0  # game over screen
+        if frame == 350:
+            inputs = Inputs(restart=True)
+        for world in (full_world, dirty_world):
+            world.step(inputs)
+        full_world.draw(full_screen, full, 0.5)
+        dirty_world.draw(screen, dirty, 0.5)
+        dirty.present()
+        assert pygame.image.tobytes(screen, "RGB") == pygame.image.tobytes(full_screen, "RGB"), \
+            f"frame {frame}"
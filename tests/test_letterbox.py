@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""letterbox_bytes fills the screen with an image larger than it, with either decoder"""
+import pygame
+import pytest
+
+from engine import reddit_loader
+from engine.reddit_loader import letterbox_bytes
+
+COLOR = (200, 100, 50)
+
+
+def jpeg_bytes(tmp_path, size):
+    image = pygame.Surface(size)
+    image.fill(COLOR)
+    path = tmp_path / "big.jpg"
+    pygame.image.save(image, str(path))
+    return path.read_bytes()
+
+
+def check_fills_screen(data, size):
+    width, height = size
+    assert len(data) == width * height * 3
+    canvas = pygame.image.frombuffer(data, size, "RGB")
+    # 4000x3000 scaled to 1920 wide overflows 1080 high: no black bars anywhere
+    for x, y in ((0, 0), (width - 1, 0), (0, height - 1), (width - 1, height - 1),
+                 (width // 2, height // 2)):
+        assert all(abs(a - b) < 8 for a, b in zip(canvas.get_at((x, y))[:3], COLOR)), (x, y)
+
+
+def test_pygame_decoder(tmp_path, monkeypatch):
+    monkeypatch.setattr(reddit_loader, "_Image", None)
+    check_fills_screen(letterbox_bytes(jpeg_bytes(tmp_path, (4000, 3000)), (1920, 1080)),
+                       (1920, 1080))
+
+
+def test_pillow_decoder(tmp_path, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    monkeypatch.setattr(reddit_loader, "_Image", Image)
+    check_fills_screen(letterbox_bytes(jpeg_bytes(tmp_path, (4000, 3000)), (1920, 1080)),
+                       (1920, 1080))
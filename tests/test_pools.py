@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""Pools reuse killed sprites and count what they hand out"""
+import pygame
+
+from engine.pools import PooledSprite, SpritePool, pool_stats
+
+
+class Dot(PooledSprite):
+    def __init__(self, x, y):
+        super().__init__()
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        self.pos = (x, y)
+
+
+def test_stats_count_live_free_and_peak():
+    pool = SpritePool(Dot, prefill=2)
+    group = pygame.sprite.Group()
+    dots = [pool.acquire(i, 0) for i in range(3)]
+    group.add(dots)
+    assert pool.stats() == {"live": 3, "free": 0, "high_water": 3, "created": 3}
+    dots[0].kill()
+    dots[0].kill()  # a second kill doesn't release it twice
+    assert pool.stats() == {"live": 2, "free": 1, "high_water": 3, "created": 3}
+    again = pool.acquire(5, 6)
+    assert again is dots[0] and again.pos == (5, 6)
+    assert pool_stats({"dots": pool})["dots"]["live"] == 3
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""cProfile captures last a stretch of time, however many frames that is"""
+import time
+
+from engine.profiler import Profiler
+
+
+def test_capture_ends_after_its_seconds(tmp_path):
+    profiler = Profiler()
+    path = tmp_path / "run.prof"
+    profiler.capture(seconds=0.2, path=str(path))
+    profiler.end_frame()
+    assert profiler.capturing and not path.exists()
+    time.sleep(0.2)
+    profiler.end_frame()
+    assert not profiler.capturing and path.exists()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""ScrollingBackground scrolls images through its strip without holding on to them"""
+import gc
+import weakref
+
+import pygame
+
+from engine.scrolling import ScrollingBackground
+
+
+def solid(color, size=(40, 30)):
+    image = pygame.Surface(size)
+    image.fill(color)
+    return image
+
+
+def test_images_scroll_through(display):
+    scroller = ScrollingBackground(40, 30, speed=1)
+    screen = pygame.Surface((40, 30))
+    assert scroller.push(solid((255, 0, 0)))  # the first image shows at once
+    assert scroller.has_image and not scroller.scrolling
+    assert scroller.push(solid((0, 255, 0)))
+    assert not scroller.wants_image and not scroller.push(solid((0, 0, 255)))
+    for _ in range(15):
+        scroller.update()
+    scroller.draw(screen)
+    assert screen.get_at((0, 0))[:3] == (0, 255, 0)  # coming in from the top
+    assert screen.get_at((0, 29))[:3] == (255, 0, 0)
+    for _ in range(15):
+        scroller.update()
+    scroller.draw(screen)
+    assert scroller.shown == 2 and scroller.wants_image
+    assert screen.get_at((0, 0))[:3] == screen.get_at((0, 29))[:3] == (0, 255, 0)
+
+
+def test_alpha_draws_between_the_last_step_and_this_one(display):
+    scroller = ScrollingBackground(40, 30, speed=4)
+    scroller.push(solid((255, 0, 0)))
+    scroller.push(solid((0, 255, 0)))
+    assert scroller.view(0.5).get_offset() == (0, 30)  # nothing to go back to yet
+    scroller.update()
+    scroller.update()
+    assert scroller.view().get_offset() == (0, 22)
+    assert scroller.view(0.0).get_offset() == (0, 26)  # where the last step left it
+    assert scroller.view(0.5).get_offset() == (0, 24)
+    assert scroller.view(1.0).get_offset() == (0, 22)
+
+
+def test_keeps_no_images(display):
+    scroller = ScrollingBackground(40, 30)
+    images = [solid((i, i, i)) for i in (10, 20)]
+    refs = [weakref.ref(image) for image in images]
+    for image in images:
+        scroller.push(image)
+    del images, image
+    gc.collect()
+    assert all(ref() is None for ref in refs)
+    assert scroller.nbytes() == scroller.strip.get_bytesize() * 40 * 60
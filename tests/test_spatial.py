@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""SpatialHash queries find exactly what checking every rect would"""
+import random
+
+import pygame
+
+from engine.spatial import SpatialHash
+
+
+class Box:
+    def __init__(self, rect):
+        self.rect = rect
+
+
+def random_rect(rng):
+    return pygame.Rect(rng.randint(-100, 700), rng.randint(-100, 1300),
+                       rng.randint(1, 200), rng.randint(1, 200))
+
+
+def test_query_matches_brute_force():
+    rng = random.Random(1)
+    boxes = [Box(random_rect(rng)) for _ in range(300)]
+    grid = SpatialHash()
+    for frame in range(20):
+        for box in boxes:
+            box.rect.move_ip(rng.randint(-40, 40), rng.randint(-40, 40))
+        alive = boxes[frame * 5:]  # some drop out every frame, like killed enemies
+        grid.sync(alive)
+        assert len(grid) == len(alive)
+        for _ in range(100):
+            rect = random_rect(rng)
+            found = grid.query(rect)
+            assert len(found) == len(set(found))
+            assert set(found) == {box for box in alive if rect.colliderect(box.rect)}
+
+
+def test_query_pairs_matches_brute_force_and_skips_removed():
+    rng = random.Random(2)
+    boxes = [Box(random_rect(rng)) for _ in range(200)]
+    probes = [Box(random_rect(rng)) for _ in range(100)]
+    grid = SpatialHash()
+    grid.sync(boxes)
+    pairs = list(grid.query_pairs(probes))
+    assert pairs == [(probe, box) for probe in probes for box in grid.query(probe.rect)]
+    assert set(pairs) == {(probe, box) for probe in probes for box in boxes
+                          if probe.rect.colliderect(box.rect)}
+
+    removed = set()
+    for probe, box in grid.query_pairs(probes):  # like bullets killing what they hit
+        assert box not in removed
+        grid.remove(box)
+        removed.add(box)
+    assert removed == {box for _, box in pairs}
+
+
+def test_query_keeps_insertion_order():
+    grid = SpatialHash()
+    boxes = [Box(pygame.Rect(10 * i, 0, 64, 64)) for i in range(5)]
+    for box in boxes:
+        grid.insert(box)
+    grid.remove(boxes[0])
+    grid.insert(boxes[0])
+    assert grid.query(pygame.Rect(0, 0, 300, 300)) == boxes[1:] + boxes[:1]
+    assert list(grid) == boxes[1:] + boxes[:1]
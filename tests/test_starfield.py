@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""Stars are drawn between steps the same way the sprites are"""
+import numpy as np
+import pygame
+
+from engine.starfield import Starfield
+
+
+def test_alpha_interpolates_and_dirty_rects_follow(display):
+    stars = Starfield(200, 200, [(50, 2.0, 2.0, 1, 1, 255, 255)], seed=3)
+    stars.y[:] = 100  # well inside the screen, so no star recycles
+    screen = pygame.Surface((200, 200), depth=32)
+    stars.update()
+    stars.draw(screen, alpha=0.0)
+    assert (np.array(stars.dirty_rects())[:, 1] == 100 - 2).all()  # the last step's spot
+    stars.draw(screen, alpha=0.5)
+    assert (np.array(stars.dirty_rects())[:, 1] == 101 - 2).all()
+    stars.draw(screen)
+    assert (np.array(stars.dirty_rects())[:, 1] == 102 - 2).all()
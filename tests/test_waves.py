@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""The default wave schedule plays exactly like the old 61-step spawn timer"""
+import random
+
+from engine.waves import WaveSchedule, default_schedule
+
+
+def old_timer(steps):
+    """Steps on which the old update() spawned: timer += 1, spawn once it passes 60"""
+    spawned, timer = [], 0
+    for step in range(1, steps + 1):
+        timer += 1
+        if timer > 60:
+            spawned.append(step)
+            timer = 0
+    return spawned
+
+
+def test_default_timeline_matches_old_timer():
+    schedule = default_schedule()
+    spawned = []
+    for step in range(1, 10001):
+        due = schedule.advance()
+        if due:
+            assert [count for _, count in due] == [1]
+            spawned.append(step)
+    assert spawned == old_timer(10000)
+
+
+def test_default_spawns_draw_like_old_timer():
+    """Same x and bomber roll from the same rng: randint(0, w) then random() < 0.2"""
+    (wave, count), = next(due for due in iter(default_schedule().advance, None) if due)
+    ours, old = random.Random(4), random.Random(4)
+    for _ in range(200):
+        x, dy, bomber = next(wave.spawns(count, 536, ours))
+        assert (x, dy, bomber) == (old.randint(0, 536), 0, old.random() < 0.2)
+
+
+def test_reset_and_loop_scale():
+    schedule = WaveSchedule.from_dict({"loop": 10, "loop_scale": 2,
+                                       "waves": [{"at": 5, "count": 3}]})
+    counts = [sum(count for _, count in schedule.advance()) for _ in range(30)]
+    assert counts[4] == 3 and counts[14] == 6 and counts[24] == 12 and sum(counts) == 21
+    schedule.reset()
+    assert [sum(count for _, count in schedule.advance()) for _ in range(5)][-1] == 3
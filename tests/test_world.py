@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""World snapshots and restarts: a restored game plays on exactly as the original"""
+import pickle
+import random
+
+import pytest
+
+import headless
+from engine.inputs import Inputs
+
+VARIANTS = [("game", {}), ("reddit", {}), ("swarm", {"batch": 20}),
+            ("game", {"waves": "waves/ramp.json"})]
+CHOICES = (headless.LEFT_FIRE, headless.RIGHT_FIRE, headless.FIRE, Inputs(restart=True))
+
+
+def random_inputs(count, seed):
+    rng = random.Random(seed)
+    return [rng.choice(CHOICES) for _ in range(count)]
+
+
+def play(world, inputs):
+    """State hash after each step"""
+    hashes = []
+    for step in inputs:
+        world.step(step)
+        hashes.append(world.state_hash())
+    return hashes
+
+
+@pytest.mark.parametrize("variant, options", VARIANTS)
+def test_restore_replays_identically(variant, options):
+    inputs = random_inputs(4000, 3)
+    world = headless.make_world(variant, 11, **options)
+    play(world, inputs[:1500])
+    snapshot = pickle.loads(pickle.dumps(world.snapshot()))
+    original = play(world, inputs[1500:])
+    world.restore(snapshot)
+    assert play(world, inputs[1500:]) == original
+
+
+@pytest.mark.parametrize("variant, options", VARIANTS)
+def test_restored_start_matches_new_world(variant, options):
+    inputs = random_inputs(2000, 5)
+    world = headless.make_world(variant, 99, **options)
+    start = world.snapshot()
+    play(world, inputs[:300])
+    world.restore(start)
+    world.reseed(5)
+    assert play(world, inputs) == play(headless.make_world(variant, 5, **options), inputs)
+
+
+def test_restart_reuses_player_and_pools():
+    world = headless.make_world("game", 1)
+    player = world.player
+    for step in random_inputs(3000, 1):
+        world.step(step)
+    created = world.enemy_pool.created, world.bullet_pool.created
+    world.player.health = 0
+    world.step(Inputs())
+    assert world.game_over
+    world.step(Inputs(restart=True))
+    assert not world.game_over
+    assert world.player is player and player.health == player.max_health
+    assert not world.bullets_group and not world.enemies_group
+    assert (world.enemy_pool.created, world.bullet_pool.created) == created